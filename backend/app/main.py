@@ -1,16 +1,23 @@
 # app/main.py
+import os
+
 from dotenv import load_dotenv
 load_dotenv()
 
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import auth, annotations, crawl_vehicle, predict, vehicle
+from app.routers import auth, annotations, crawl_vehicle, predict, stats, train, vehicle
 from app.routers.auth import get_current_user
 from app.schemas import UserOut
+from app.core.responses import FastJSONResponse
 from app import models
+from app.services.model_registry import registry
+from app.services.model_store import model_store
+from app.services.inference_executor import inference_executor
+from app.services.train_jobs import train_job_runner
 
-app = FastAPI(title="Vehicle Price API")
+app = FastAPI(title="Vehicle Price API", default_response_class=FastJSONResponse)
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
@@ -31,6 +38,8 @@ app.include_router(auth.router)
 app.include_router(annotations.router)
 app.include_router(crawl_vehicle.router)
 app.include_router(predict.router)
+app.include_router(train.router)
+app.include_router(stats.router)
 # app.include_router(vehicle.router)
 
 # ======================
@@ -45,8 +54,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 前端翻页要读这个响应头
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# 模型仓库里还没有版本时，启动就用当前库里的数据提交一次后台训练（不阻塞 uvicorn 启动）
+TRAIN_ON_STARTUP = os.getenv("TRAIN_ON_STARTUP", "1") == "1"
+
+# ======================
+# 启动时预加载模型（每个 worker 一份，请求间共享）
+# ======================
+@app.on_event("startup")
+def preload_model():
+    if TRAIN_ON_STARTUP and model_store.current_version() is None:
+        # 只看模型仓库：仓库里带的 car_price_model.pkl 是开发机上训的，只能先顶着用，
+        # 新部署要用自己库里的数据训一个（多个 worker 都提交也只会真正训一次），训完自动上线
+        job = train_job_runner.submit("full", if_missing=True)
+        print(f"🚀 模型仓库为空，已提交后台训练任务: {job['job_id']}")
+
+    try:
+        registry.reload(force=True)
+    except FileNotFoundError:
+        print(f"⚠️ 模型不存在：{registry.store.current_pointer if registry.store else ''} / {registry.path}")
+        return
+
+    if inference_executor is not None:
+        inference_executor.start()
+
+
+@app.on_event("shutdown")
+def shutdown_inference_executor():
+    if inference_executor is not None:
+        inference_executor.shutdown()
+    train_job_runner.shutdown()
+
 # ======================
 # 当前用户
 # ======================
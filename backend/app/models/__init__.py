@@ -1,3 +1,5 @@
 from .crawl_car import CrawlCar
-from .car import Car
+from .crawl_car_feature import CrawlCarFeature
+from .crawl_car_stat import CrawlCarStat, CrawlCarStatWatermark
+from .car import Car, CarSyncCounter
 from .user import User
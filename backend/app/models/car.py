@@ -1,5 +1,5 @@
 # app/models/car.py
-from sqlalchemy import Column, Integer, Float, String
+from sqlalchemy import BigInteger, Column, Integer, Float, String
 from app.db import Base
 
 class Car(Base):
@@ -22,3 +22,15 @@ class Car(Base):
     city = Column(String(64))                       # 车源地
 
     price_wan = Column(Float, nullable=False)
+
+    # 增量同步序号（/annotations/ids/changes）：写入时在同一个事务里从 CarSyncCounter 分配，
+    # 分配时持有计数器行锁直到提交，所以序号顺序 = 提交顺序（自增 id 是插入时分配的，做不到这一点）
+    sync_seq = Column(BigInteger, index=True)
+
+
+class CarSyncCounter(Base):
+    """按提交顺序的序号分配到哪了：cars.sync_seq（name=cars）、crawl_car_features.import_seq（name=crawl_car_features）"""
+    __tablename__ = "car_sync_counters"
+
+    name = Column(String(32), primary_key=True)
+    value = Column(BigInteger, nullable=False, default=0)
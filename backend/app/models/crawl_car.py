@@ -1,8 +1,59 @@
 # app/models/crawl_car.py
-from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, Numeric, Computed
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql.expression import FunctionElement
 from datetime import datetime
 from app.db import Base
 
+
+# ======================
+# info JSON 上的生成列表达式
+# MySQL 8 用 JSON_VALUE / REGEXP_SUBSTR（取不到或格式不对时为 NULL，不会让 INSERT 报错）；
+# 其他方言（本地 SQLite）用 json_extract，保证 create_all 也能建表
+# ======================
+class info_number(FunctionElement):
+    """info 里的数值字段，比如 当前售价 24.98"""
+    inherit_cache = True
+
+    def __init__(self, key: str):
+        self.key = key
+        super().__init__()
+
+
+class info_year(FunctionElement):
+    """info 里 "2023年11月" 这种字段的年份"""
+    inherit_cache = True
+
+    def __init__(self, key: str):
+        self.key = key
+        super().__init__()
+
+
+@compiles(info_number, "mysql")
+def _info_number_mysql(element, compiler, **kw):
+    return f"""JSON_VALUE(info, '$."{element.key}"' RETURNING DECIMAL(10,2) NULL ON EMPTY NULL ON ERROR)"""
+
+
+@compiles(info_number)
+def _info_number_default(element, compiler, **kw):
+    path = f"""'$."{element.key}"'"""
+    return f"CASE WHEN json_type(info, {path}) IN ('integer', 'real') THEN json_extract(info, {path}) END"
+
+
+@compiles(info_year, "mysql")
+def _info_year_mysql(element, compiler, **kw):
+    # 和 features.parse_plate_year 一样取 “xxxx年” 的四位数字
+    value = f"""JSON_VALUE(info, '$."{element.key}"' RETURNING CHAR(32) NULL ON ERROR)"""
+    return f"CAST(LEFT(REGEXP_SUBSTR({value}, '[0-9]{{4}}年'), 4) AS UNSIGNED)"
+
+
+@compiles(info_year)
+def _info_year_default(element, compiler, **kw):
+    value = f"""json_extract(info, '$."{element.key}"')"""
+    return f"CASE WHEN {value} GLOB '[0-9][0-9][0-9][0-9]年*' THEN CAST(substr({value}, 1, 4) AS INTEGER) END"
+
+
 class CrawlCar(Base):
     __tablename__ = "crawl_cars"
 
@@ -23,4 +74,32 @@ class CrawlCar(Base):
     page_no = Column(Integer)
     crawl_time = Column(DateTime, default=datetime.utcnow)
 
-    is_annotated = Column(Integer, default=0)
+    # 标注时和 cars 同一个事务里置 1（annotation_service.mark_annotated）
+    is_annotated = Column(Integer, default=0, server_default="0", nullable=False)
+
+    # info JSON 的虚拟生成列（不占存储，二级索引里物化），
+    # 价格 / 上牌年份的范围查询走索引，不用逐行解析 JSON
+    price_used = Column(Numeric(10, 2, asdecimal=False), Computed(info_number("当前售价"), persisted=False))
+    price_new = Column(Numeric(10, 2, asdecimal=False), Computed(info_number("新车指导价"), persisted=False))
+    plate_year = Column(Integer, Computed(info_year("上牌时间"), persisted=False))
+
+    # 解析好的类型化字段（crawl_car_features）
+    features = relationship(
+        "CrawlCarFeature",
+        back_populates="car",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    __table_args__ = (
+        # /crawl-cars 的游标分页：ORDER BY crawl_time DESC, id DESC
+        Index("ix_crawl_cars_crawl_time_id", "crawl_time", "id"),
+        # 按标注状态过滤时同样按 (crawl_time, id) 翻页
+        Index("ix_crawl_cars_annotated_crawl_time_id", "is_annotated", "crawl_time", "id"),
+        Index("ix_crawl_cars_price_used", "price_used"),
+        Index("ix_crawl_cars_price_new", "price_new"),
+        Index("ix_crawl_cars_plate_year", "plate_year"),
+        # /crawl-cars/search：中文标题用 ngram 全文索引（只在 MySQL 上生效）
+        Index("ft_crawl_cars_title", "title", mysql_prefix="FULLTEXT", mysql_with_parser="ngram"),
+    )
@@ -0,0 +1,34 @@
+# app/models/crawl_car_feature.py
+from sqlalchemy import BigInteger, Column, Integer, Float, String, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from app.db import Base
+
+class CrawlCarFeature(Base):
+    """
+    CrawlCar.info 解析后的类型化字段（一对一）。
+    训练 / 统计直接查这里的列，不用每次都解析 JSON。
+    """
+    __tablename__ = "crawl_car_features"
+
+    crawl_car_id = Column(
+        Integer,
+        ForeignKey("crawl_cars.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    brand = Column(String(64), index=True)          # 标题第一个词：传祺M8
+    plate_year = Column(Integer, index=True)        # 上牌年份：2023（车龄 = 今年 - 上牌年份）
+    engine = Column(Float)                          # 排量：2.0
+    gearbox = Column(String(32), index=True)        # 自动 / 手动
+    transfer_cnt = Column(Integer)                  # 过户次数
+    price_new = Column(Float)                       # 新车指导价（万）
+    price_used = Column(Float, index=True)          # 当前售价（万）
+    city = Column(String(64), index=True)           # 车源地
+    # 按提交顺序的导入序号（见 app/services/import_seq.py），看板统计 / 增量训练的水位线
+    import_seq = Column(BigInteger, index=True)
+
+    car = relationship("CrawlCar", back_populates="features")
+
+    __table_args__ = (
+        Index("ix_crawl_car_features_brand_price", "brand", "price_used"),
+    )
@@ -0,0 +1,34 @@
+# app/models/crawl_car_stat.py
+from sqlalchemy import BigInteger, Column, Integer, Float, String, DateTime
+from app.db import Base
+
+class CrawlCarStat(Base):
+    """
+    看板用的预聚合结果：每个 (维度, 分桶) 一行，只存 count / sum，
+    新数据入库后按增量累加（见 app/services/crawl_stats.py）。
+    维度：brand / price_bin / plate_year / gearbox / city
+    """
+    __tablename__ = "crawl_car_stats"
+
+    dimension = Column(String(32), primary_key=True)
+    bucket = Column(String(64), primary_key=True)
+
+    cnt = Column(Integer, nullable=False, default=0)
+
+    # 求平均用：sum / 有值的行数
+    price_used_sum = Column(Float, nullable=False, default=0.0)
+    price_used_cnt = Column(Integer, nullable=False, default=0)
+    price_new_sum = Column(Float, nullable=False, default=0.0)
+    price_new_cnt = Column(Integer, nullable=False, default=0)
+    # 折旧率 (新车指导价 - 当前售价) / 新车指导价，两个价格都有的行才算
+    depreciation_sum = Column(Float, nullable=False, default=0.0)
+    depreciation_cnt = Column(Integer, nullable=False, default=0)
+
+
+class CrawlCarStatWatermark(Base):
+    """crawl_car_stats 已经累加到哪个 crawl_car_features.import_seq（只有一行）"""
+    __tablename__ = "crawl_car_stat_watermarks"
+
+    name = Column(String(32), primary_key=True)
+    last_seq = Column(BigInteger, nullable=False, default=0)
+    refreshed_at = Column(DateTime)
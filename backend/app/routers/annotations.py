@@ -1,10 +1,25 @@
 # app/routers/annotations.py
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core.responses import FastJSONResponse
 from app.db import get_db
 from app.models.car import Car
-from app.schemas import CarAnnotationCreate
+from app.schemas import CarAnnotationBulkCreate, CarAnnotationCreate
+from app.services.annotation_service import STATUS_CREATED, STATUS_DUPLICATE, bulk_create_annotations, mark_annotated
+from app.services.annotation_sync import (
+    CHANGES_DEFAULT_LIMIT,
+    CHANGES_MAX_LIMIT,
+    annotated_changes,
+    allocate_sync_seq,
+    annotated_snapshot,
+    current_version,
+    lock_sync_counter,
+)
+from app.services.crawl_list_cache import etag_matches, invalidate_crawl_listing, make_etag
 
 router = APIRouter(prefix="/annotations", tags=["annotations"])
 
@@ -17,9 +32,11 @@ def create_annotation(
     """
     标注一个车辆（车价）：
     - 幂等：同一个 source_car_id 只能标注一次
-    - 写入 cars 表（作为训练数据）
+    - 写入 cars 表（作为训练数据），同一个事务里把 crawl_cars.is_annotated 置 1
     """
 
+    # 增量同步序号：先锁计数器，提交前一直持有
+    counter = lock_sync_counter(db)
     exists = (
         db.query(Car)
         .filter(Car.source_car_id == data.source_car_id)
@@ -40,16 +57,73 @@ def create_annotation(
         gearbox=data.gearbox,
         transfer_count=data.transfer_count,
         city=data.city,
+        sync_seq=allocate_sync_seq(counter, 1),
     )
 
     db.add(car)
+    marked = mark_annotated(db, [data.source_car_id])
     db.commit()
     db.refresh(car)
+    if marked:
+        invalidate_crawl_listing()
 
     return {"ok": True, "car_id": car.id}
 
 
+@router.post("/bulk")
+def create_annotations_bulk(
+    data: CarAnnotationBulkCreate,
+    db: Session = Depends(get_db),
+):
+    """
+    批量标注：一个事务写完整批，已经标注过的 source_car_id 跳过（status=duplicate），
+    缺 brand / model / year 的条目不写入（status=error，detail 说明缺哪些），
+    同时把对应 crawl_cars.is_annotated 置 1
+    """
+    items = bulk_create_annotations(db, data.items)
+    created = sum(1 for i in items if i["status"] == STATUS_CREATED)
+    duplicate = sum(1 for i in items if i["status"] == STATUS_DUPLICATE)
+    return {
+        "ok": True,
+        "created": created,
+        "duplicate": duplicate,
+        "error": len(items) - created - duplicate,
+        "items": items,
+    }
+
+
 @router.get("/ids")
 def get_annotated_source_ids(db: Session = Depends(get_db)):
-    rows = db.query(Car.source_car_id).all()
-    return [r[0] for r in rows]
+    # 整表下载，保留给老前端；新代码用 /ids/snapshot + /ids/changes
+    # 只取一列标量，直接 orjson 输出，不走 jsonable_encoder
+    return FastJSONResponse(db.scalars(select(Car.source_car_id)).all())
+
+
+@router.get("/ids/snapshot")
+def get_annotated_snapshot(
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    全量快照：id 排序后差分编码（deltas 前缀和还原），带 version。
+    之后用 /ids/changes?since=version 增量更新；没有新标注时带 If-None-Match 直接 304。
+    """
+    version = current_version(db)
+    etag = make_etag(str(version), "annotated-snapshot")
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return FastJSONResponse(annotated_snapshot(db, version), headers=headers)
+
+
+@router.get("/ids/changes")
+def get_annotated_changes(
+    since: int = Query(0, ge=0, description="上次拿到的 version"),
+    limit: int = Query(CHANGES_DEFAULT_LIMIT, ge=1, le=CHANGES_MAX_LIMIT),
+    db: Session = Depends(get_db),
+):
+    """
+    since 之后新增的已标注 source_car_id。
+    has_more=true 时拿返回的 version 继续请求；reset=true 时重新拉快照。
+    """
+    return FastJSONResponse(annotated_changes(db, since, limit))
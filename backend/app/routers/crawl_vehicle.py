@@ -1,13 +1,189 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app import models
+from app.core.responses import FastJSONResponse, dumps
 from app.schemas.crawl_vehicle import CrawlVehicleOut
+from app.services.crawl_car_query import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    SUMMARY_FIELDS,
+    CrawlCarFilters,
+    apply_filters,
+    apply_keyset,
+    crawl_car_filters,
+    full_view_rows,
+    full_view_select,
+    next_cursor,
+    parse_fields,
+    project_rows,
+    projection_select,
+)
+from app.services.crawl_export import EXPORT_FORMATS, check_format, export_fields, stream_export
+from app.services.crawl_list_cache import (
+    CachedPage,
+    crawl_list_cache,
+    etag_matches,
+    make_etag,
+    normalize_query,
+    table_version,
+)
+from app.services.title_search import encode_search_cursor, search_titles
 
 router = APIRouter(prefix="/crawl-cars", tags=["crawl"])
 
+
+def _render_page(
+    db: Session,
+    filters: CrawlCarFilters,
+    cursor: Optional[str],
+    limit: int,
+    names: Optional[list[str]],
+) -> CachedPage:
+    if names is not None:
+        # 字段投影：只查需要的列
+        stmt, features_joined = projection_select(names)
+        stmt = apply_keyset(apply_filters(stmt, filters, features_joined), cursor)
+        rows = db.execute(stmt.limit(limit + 1)).all()
+        return CachedPage(dumps(project_rows(rows[:limit], names)), next_cursor(rows, limit))
+
+    # 完整模式：字段和 CrawlVehicleOut 一致（按别名 source_car_id 输出），
+    # 但直接从行元组拼 dict 交给 orjson，不加载 ORM 对象、不逐行构造 pydantic 模型
+    stmt = apply_keyset(apply_filters(full_view_select(), filters), cursor)
+    rows = db.execute(stmt.limit(limit + 1)).all()
+    return CachedPage(dumps(full_view_rows(rows[:limit])), next_cursor(rows, limit))
+
+
+def _listing_response(
+    request: Request,
+    db: Session,
+    filters: CrawlCarFilters,
+    cursor: Optional[str],
+    limit: int,
+    names: Optional[list[str]],
+    if_none_match: Optional[str],
+) -> Response:
+    # 路径也算进 ETag：/crawl-cars 和 /crawl-cars/queue 同样的参数结果不同
+    query = f"{request.url.path}?{normalize_query(request.url.query)}"
+    etag = make_etag(table_version(db), query)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    page = crawl_list_cache.get(etag)
+    if page is None:
+        page = _render_page(db, filters, cursor, limit, names)
+        crawl_list_cache.set(etag, page)
+
+    if page.next_cursor:
+        headers["X-Next-Cursor"] = page.next_cursor
+    return Response(page.body, media_type="application/json", headers=headers)
+
+
 @router.get("", response_model=list[CrawlVehicleOut])
-def list_crawl_cars(db: Session = Depends(get_db)):
-    return db.query(models.CrawlCar).order_by(
-        models.CrawlCar.crawl_time.desc()
-    ).limit(100).all()
\ No newline at end of file
+def list_crawl_cars(
+    request: Request,
+    filters: CrawlCarFilters = Depends(crawl_car_filters),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: Literal["full", "summary"] = Query("full", description="summary：只返回标量字段，不含 info / tags"),
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，如 source_car_id,title,price_used"),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    按抓取时间倒序分页。返回体仍然是数组（兼容前端），
+    还有下一页时响应头带 X-Next-Cursor，原样放进 ?cursor= 取下一页。
+    每行带标注状态 is_annotated 和标注价 annotated_price，前端不用再单独拉 /annotations/ids。
+    view=summary / fields= 时只查需要的列。
+    响应带 ETag，数据没变时带 If-None-Match 再请求直接 304。
+    """
+    names = parse_fields(fields, view)
+    return _listing_response(request, db, filters, cursor, limit, names, if_none_match)
+
+
+@router.get("/queue", response_model=list[CrawlVehicleOut])
+def list_unannotated_queue(
+    request: Request,
+    filters: CrawlCarFilters = Depends(crawl_car_filters),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    view: Literal["full", "summary"] = Query("full"),
+    fields: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    待标注队列：只返回没标注的车，分页方式和 /crawl-cars 一样。
+    直接在 ix_crawl_cars_annotated_crawl_time_id 上按 (is_annotated=0, crawl_time, id) 范围扫描。
+    """
+    filters.annotated = False
+    names = parse_fields(fields, view)
+    return _listing_response(request, db, filters, cursor, limit, names, if_none_match)
+
+
+@router.get("/search")
+def search_crawl_cars(
+    q: str = Query(..., min_length=1, max_length=100, description="标题关键词，如 传祺M8 2024款"),
+    cursor: Optional[str] = Query(None, description="上一页响应头 X-Next-Cursor 的值"),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认同 view=summary"),
+    db: Session = Depends(get_db),
+):
+    """
+    标题全文检索，按相关度排序，每行多一个 score 字段。
+    和列表一样：还有下一页时响应头带 X-Next-Cursor。
+    """
+    names = parse_fields(fields, "summary") or list(SUMMARY_FIELDS)
+    hits = search_titles(db, q, limit + 1, cursor)
+
+    headers = {}
+    if len(hits) > limit:
+        last_id, last_score = hits[limit - 1]
+        headers["X-Next-Cursor"] = encode_search_cursor(last_score, last_id)
+    hits = hits[:limit]
+    if not hits:
+        return FastJSONResponse([], headers=headers)
+
+    # 只回表取这一页的几行，再按相关度顺序排回去
+    stmt, _ = projection_select(names)
+    rows = db.execute(stmt.where(models.CrawlCar.id.in_([car_id for car_id, _ in hits]))).all()
+    by_id = {r.id: r for r in rows}
+    # 检索索引和回表之间行可能被删了，查不到的跳过
+    found = [(car_id, score) for car_id, score in hits if car_id in by_id]
+    items = []
+    for (car_id, score), item in zip(found, project_rows([by_id[car_id] for car_id, _ in found], names)):
+        item["score"] = score
+        items.append(item)
+    return FastJSONResponse(items, headers=headers)
+
+
+@router.get("/export")
+def export_crawl_cars(
+    filters: CrawlCarFilters = Depends(crawl_car_filters),
+    format: Literal["ndjson", "csv", "parquet"] = Query("ndjson"),
+    fields: Optional[str] = Query(None, description="逗号分隔的字段列表，默认全部字段"),
+):
+    """
+    全量导出（过滤参数同列表接口），按 id 升序流式输出，不分页。
+    服务端游标分块读取，导出一千行和一千万行占的内存一样。
+    """
+    names = export_fields(fields)
+    check_format(format)
+    media_type, ext = EXPORT_FORMATS[format]
+    filename = f"crawl_cars_{datetime.now():%Y%m%d_%H%M%S}.{ext}"
+    return StreamingResponse(
+        stream_export(filters, names, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/cache/stats")
+def get_crawl_list_cache_stats():
+    return crawl_list_cache.stats()
@@ -1,13 +1,153 @@
+import os
+
 import pandas as pd
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from app.schemas.predict import CarPredictIn
-from app.train import load_model
+from app.routers.auth import get_current_user
+from app.services.model_registry import registry
+from app.services.predict_cache import make_key, normalize_input, predict_cache
+from app.services.micro_batcher import micro_batcher
+from app.services.inference_executor import InferenceQueueFull, inference_executor
+from app.services.batch_predict import (
+    aiter_ndjson_rows,
+    aiter_rows,
+    parse_json_array,
+    stream_predictions,
+)
 
 router = APIRouter(tags=["predict"])
 
+# compiled：线性模型直接用打分表做算术（微秒级）；sklearn：走完整 Pipeline
+PREDICT_ENGINE = os.getenv("PREDICT_ENGINE", "compiled")
+
+if predict_cache is not None:
+    # 模型换了，旧结果全部作废
+    registry.add_listener(lambda _loaded: predict_cache.clear())
+
+
+def _score(loaded, row: dict) -> float:
+    if PREDICT_ENGINE == "compiled" and loaded.scoring is not None:
+        return loaded.scoring.score(row)
+    X = pd.DataFrame([row])
+    return float(loaded.model.predict(X)[0])
+
+
+def _result(y_pred: float, model_version: str) -> dict:
+    return {
+        "predicted_price": round(y_pred, 2),
+        "price_unit": "万",
+        "model_version": model_version,
+    }
+
+
+def _predict_sync(data: CarPredictIn, loaded=None) -> dict:
+    if loaded is None:
+        loaded = registry.get()
+    row = normalize_input(data)
+
+    if predict_cache is None:
+        y_pred = _score(loaded, row)
+    else:
+        key = make_key(row, loaded.version)
+        y_pred = predict_cache.get(key)
+        if y_pred is None:
+            y_pred = _score(loaded, row)
+            predict_cache.set(key, y_pred)
+    return _result(y_pred, loaded.version)
+
+
+async def _predict_async(data: CarPredictIn) -> dict:
+    # get() 到了检查间隔会 stat 文件，模型变了还会在锁里重新加载，不能放在事件循环上
+    loaded = await run_in_threadpool(registry.get)
+    # 打分表只是几次加法，没必要排队攒批 / 丢进进程池
+    if PREDICT_ENGINE == "compiled" and loaded.scoring is not None:
+        return await run_in_threadpool(_predict_sync, data, loaded)
+
+    row = normalize_input(data)
+    key = make_key(row, loaded.version) if predict_cache is not None else None
+    y_pred = None
+    if key is not None:
+        y_pred = await run_in_threadpool(predict_cache.get, key)
+    if y_pred is not None:
+        return _result(y_pred, loaded.version)
+
+    version = loaded.version
+    try:
+        if micro_batcher is not None:
+            version, y_pred = await micro_batcher.submit(loaded, row)
+        else:
+            version, (y_pred,) = await inference_executor.run(loaded, [row])
+    except InferenceQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    # 进程池里的模型可能已经先一步热更新，以实际算出结果的版本为准
+    if key is not None and version == loaded.version:
+        await run_in_threadpool(predict_cache.set, key, y_pred)
+    return _result(y_pred, version)
+
+
 @router.post("/predict")
-def predict_car_price(data: CarPredictIn):
-    model = load_model()
-    X = pd.DataFrame([data.dict()])
-    y_pred = float(model.predict(X)[0])
-    return {"predicted_price": round(y_pred, 2), "price_unit": "万"}
+async def predict_car_price(data: CarPredictIn):
+    if micro_batcher is None and inference_executor is None:
+        return await run_in_threadpool(_predict_sync, data)
+    return await _predict_async(data)
+
+
+@router.get("/predict/model")
+def get_model_info():
+    return registry.info()
+
+
+@router.get("/predict/cache/stats")
+def get_cache_stats():
+    if predict_cache is None:
+        return {"backend": "off"}
+    return predict_cache.stats()
+
+
+@router.get("/predict/batcher/stats")
+def get_batcher_stats():
+    if micro_batcher is None:
+        return {"enabled": False}
+    return micro_batcher.stats()
+
+
+@router.get("/predict/executor/stats")
+def get_executor_stats():
+    if inference_executor is None:
+        return {"mode": "inline"}
+    return inference_executor.stats()
+
+
+@router.post("/predict/model/reload")
+def reload_model(_user=Depends(get_current_user)):
+    # 手动触发：不管 mtime 有没有变，都重新加载
+    registry.reload(force=True)
+    return registry.info()
+
+
+@router.post("/predict/batch")
+async def predict_batch(request: Request):
+    """
+    批量预测：
+    - Content-Type: application/json      -> 请求体是 CarPredictIn 数组
+    - Content-Type: application/x-ndjson  -> 每行一个 CarPredictIn
+    返回 NDJSON，按输入顺序一行一条：{"index", "predicted_price" | "error", "model_version"}
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type:
+        # 注意：不能边读 request.stream() 边回写 StreamingResponse，
+        # 部分 ASGI server 会在响应开始后把剩余的 body 消息吞掉
+        rows = aiter_ndjson_rows(await request.body())
+    else:
+        try:
+            rows = aiter_rows(parse_json_array(await request.body()))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"请求体格式错误: {e}")
+
+    return StreamingResponse(
+        stream_predictions(rows),
+        media_type="application/x-ndjson",
+    )
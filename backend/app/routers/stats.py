@@ -0,0 +1,52 @@
+# app/routers/stats.py
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.routers.auth import get_current_user
+from app.services import crawl_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+# 所有接口只读预聚合表 crawl_car_stats，导入数据后由 refresh_stats 增量更新
+
+
+@router.get("")
+def get_stats_overview(db: Session = Depends(get_db)):
+    return crawl_stats.stats_overview(db)
+
+
+@router.get("/brands")
+def get_brand_counts(limit: int = Query(20, ge=1, le=500), db: Session = Depends(get_db)):
+    return crawl_stats.brand_counts(db, limit)
+
+
+@router.get("/price-histogram")
+def get_price_histogram(
+    bin_width: int = Query(crawl_stats.PRICE_BIN_WIDTH, ge=1, le=100, description="桶宽（万）"),
+    db: Session = Depends(get_db),
+):
+    return crawl_stats.price_histogram(db, bin_width)
+
+
+@router.get("/depreciation")
+def get_depreciation_by_age(db: Session = Depends(get_db)):
+    """按车龄：平均售价 / 平均新车指导价 / 平均折旧率"""
+    return crawl_stats.depreciation_by_age(db)
+
+
+@router.get("/gearbox")
+def get_gearbox_share(db: Session = Depends(get_db)):
+    return crawl_stats.gearbox_share(db)
+
+
+@router.get("/cities")
+def get_city_distribution(limit: int = Query(20, ge=1, le=500), db: Session = Depends(get_db)):
+    return crawl_stats.city_distribution(db, limit)
+
+
+@router.post("/refresh")
+def refresh_stats(rebuild: bool = False, db: Session = Depends(get_db), _user=Depends(get_current_user)):
+    # 平时导入脚本会自己刷新；rebuild=true 清空重算（比如回填完 crawl_car_features 之后）
+    rows = crawl_stats.rebuild_stats(db) if rebuild else crawl_stats.refresh_stats(db)
+    return {"aggregated_rows": rows, **crawl_stats.stats_overview(db)}
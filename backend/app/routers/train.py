@@ -0,0 +1,37 @@
+# app/routers/train.py
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.routers.auth import get_current_user
+from app.schemas.train import TrainJobCreate
+from app.services.train_jobs import list_jobs, read_job, train_job_runner
+
+router = APIRouter(prefix="/train", tags=["train"])
+
+
+@router.post("", status_code=202)
+def create_train_job(data: TrainJobCreate, _user=Depends(get_current_user)):
+    """
+    提交一个后台训练任务，立即返回 job_id；
+    训练在独立子进程里跑，成功后自动切换线上模型
+    """
+    params = {}
+    if data.mode == "search":
+        params = {"folds": data.folds, "save_best": data.save_best}
+    elif data.mode == "incremental":
+        params = {"replace_current": data.replace_current}
+    return train_job_runner.submit(data.mode, **params)
+
+
+@router.get("/jobs")
+def get_train_jobs(limit: int = 20):
+    return list_jobs(limit)
+
+
+@router.get("/{job_id}")
+def get_train_job(job_id: str):
+    """状态 queued / running / succeeded / failed / skipped，progress 0~1，stages 是各阶段耗时（秒）"""
+    job = read_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="训练任务不存在")
+    job.pop("traceback", None)
+    return job
@@ -3,7 +3,7 @@
 from .user import UserCreate, UserRead, UserOut, UserUpdate, PasswordUpdate
 from .auth import Token, TokenData
 
-from .annotation import CarAnnotationCreate
+from .annotation import CarAnnotationBulkCreate, CarAnnotationCreate
 from .crawl_vehicle import CrawlVehicleOut
 from .predict import CarPredictIn
 
@@ -16,6 +16,7 @@ __all__ = [
     "Token",
     "TokenData",
     "CarAnnotationCreate",
+    "CarAnnotationBulkCreate",
     "CrawlVehicleOut",
     "CarPredictIn",
 ]
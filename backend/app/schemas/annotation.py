@@ -1,5 +1,5 @@
 # app/schemas/car_annotation.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 
 
@@ -17,3 +17,8 @@ class CarAnnotationCreate(BaseModel):
     gearbox: Optional[str] = None
     transfer_count: Optional[int] = None
     city: Optional[str] = None
+
+
+class CarAnnotationBulkCreate(BaseModel):
+    # 一次最多 1000 条：一条多行 INSERT，一个事务
+    items: list[CarAnnotationCreate] = Field(..., min_length=1, max_length=1000)
@@ -15,6 +15,10 @@ class CrawlVehicleOut(BaseModel):
     image_path: Optional[str] = None
     crawl_time: Optional[datetime] = None
 
+    # 标注状态（0 / 1）和标注价（万），没标注时为 null
+    is_annotated: int = 0
+    annotated_price: Optional[float] = None
+
     class Config:
         from_attributes = True
         populate_by_name = True
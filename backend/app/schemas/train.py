@@ -0,0 +1,14 @@
+# app/schemas/train.py
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class TrainJobCreate(BaseModel):
+    # full：全量 LinearRegression；incremental：按水位线增量；search：多模型交叉验证选最优
+    mode: Literal["full", "incremental", "search"] = "full"
+    # 以下只对 search 生效
+    folds: int = Field(5, ge=2, le=20)
+    save_best: bool = True
+    # 只对 incremental 生效：线上模型是 full / search 发布的时候，默认不替换
+    replace_current: bool = False
@@ -0,0 +1,71 @@
+# app/scripts/backfill_crawl_features.py
+"""
+一次性回填 crawl_car_features：给已有、但还没有解析字段的 crawl_cars 补上。
+按 id 分块流式读取，每块列式解析后批量写入，可以重复执行（只补缺的）。
+补上的行照常分配 import_seq，看板统计增量刷新就能看到，不用整体重算。
+    uv run python -m app.scripts.backfill_crawl_features
+"""
+import time
+
+from sqlalchemy import insert, select
+
+from app.db import SessionLocal
+from app.models.crawl_car import CrawlCar
+from app.models.crawl_car_feature import CrawlCarFeature
+from app.services.crawl_stats import refresh_stats
+from app.services.features import feature_records
+from app.services.import_seq import stamp_import_seq
+
+CHUNK_SIZE = 5000
+
+
+def backfill(chunk_size: int = CHUNK_SIZE) -> int:
+    db = SessionLocal()
+    total = 0
+    last_id = 0
+    t0 = time.perf_counter()
+
+    try:
+        while True:
+            # 按主键分页（keyset），每块一个事务；已有特征的行跳过
+            rows = db.execute(
+                select(CrawlCar.id, CrawlCar.title, CrawlCar.info)
+                .outerjoin(CrawlCarFeature, CrawlCarFeature.crawl_car_id == CrawlCar.id)
+                .where(CrawlCar.id > last_id, CrawlCarFeature.crawl_car_id.is_(None))
+                .order_by(CrawlCar.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+
+            records = feature_records([r.title for r in rows], [r.info for r in rows])
+            for r, rec in zip(rows, records):
+                rec["crawl_car_id"] = r.id
+            stamp_import_seq(db, records)
+
+            db.execute(insert(CrawlCarFeature), records)
+            db.commit()
+
+            total += len(rows)
+            last_id = rows[-1].id
+            print(f"... {total} rows (last id={last_id})")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - t0
+    print(f"✅ 回填 {total} 条，用时 {elapsed:.1f}s")
+
+    if total:
+        db = SessionLocal()
+        try:
+            print(f"✅ 看板统计新增 {refresh_stats(db)} 条")
+        finally:
+            db.close()
+    return total
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,63 @@
+# app/scripts/bench_features.py
+"""
+列式特征解析 vs 逐行 build_row 的耗时：把样本放大到 N 行（默认 100 万）分别跑一遍
+（两边结果一致由 tests/test_features.py 保证）
+    uv run python -m app.scripts.bench_features --rows 1000000
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+from app.services.features import FEATURE_COLUMNS, REQUIRED_COLS, TARGET_COL, build_features
+from app.train import build_row
+
+DEFAULT_JSON_DIR = Path(__file__).resolve().parents[2] / "data" / "crawl" / "json"
+
+
+def load_samples(folder: Path) -> list[SimpleNamespace]:
+    samples = []
+    for p in sorted(folder.glob("*.json")):
+        d = json.loads(p.read_text(encoding="utf-8"))
+        samples.append(SimpleNamespace(title=d.get("title"), info=d.get("info")))
+    return samples
+
+
+def rowwise(samples) -> pd.DataFrame:
+    rows = []
+    for c in samples:
+        r = build_row(c)
+        if any(r[k] is None for k in REQUIRED_COLS):
+            continue
+        rows.append(r)
+    return pd.DataFrame(rows, columns=FEATURE_COLUMNS + [TARGET_COL])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--json-dir", default=str(DEFAULT_JSON_DIR))
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    samples = load_samples(Path(args.json_dir))
+
+    big = (samples * (args.rows // len(samples) + 1))[: args.rows]
+    titles = [c.title for c in big]
+    infos = [c.info for c in big]
+
+    t0 = time.perf_counter()
+    rowwise(big)
+    t_row = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    build_features(titles, infos)
+    t_col = time.perf_counter() - t0
+
+    print(f"rows={args.rows}  build_row: {t_row:.2f}s  build_features: {t_col:.2f}s  speedup: {t_row / t_col:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# app/scripts/bench_inference.py
+"""
+对比 inline / thread / process 三种推理执行方式的延迟：
+    uv run python -m app.scripts.bench_inference --requests 2000 --concurrency 64
+默认压测模型仓库里的当前版本；想测别的模型（GBDT / 随机森林）时用 --model 指向对应的 pkl。
+"""
+import argparse
+import asyncio
+import time
+from typing import Optional
+
+import numpy as np
+
+from app.services.inference_executor import InferenceExecutor
+from app.services.model_registry import ModelRegistry
+
+SAMPLE_ROW = {
+    "brand": "传祺M8",
+    "age_years": 2.0,
+    "engine": 2.0,
+    "gearbox": "自动",
+    "transfer_cnt": 1,
+    "price_new": 24.98,
+}
+
+
+async def bench_mode(mode: str, model_path: Optional[str], requests: int, concurrency: int, workers: int) -> dict:
+    registry = ModelRegistry() if model_path is None else ModelRegistry(model_path, store=None)
+    loaded = registry.reload(force=True)
+    executor = InferenceExecutor(mode, workers=workers, queue_size=requests, model_path=model_path)
+    executor.start()
+
+    latencies: list[float] = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            t0 = time.perf_counter()
+            # 模拟真实服务里的 IO 切换点：inline 模式下别的请求会在这里插队占住事件循环
+            await asyncio.sleep(0)
+            await executor.run(loaded, [SAMPLE_ROW])
+            latencies.append(time.perf_counter() - t0)
+
+    # 预热：进程池第一次调用有额外开销
+    await asyncio.gather(*[one() for _ in range(min(concurrency, requests))])
+    latencies.clear()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - t0
+    executor.shutdown()
+
+    ms = np.array(latencies) * 1000
+    return {
+        "mode": mode,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "rps": requests / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default=None, help="单文件模型路径，不填则用模型仓库的当前版本")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", default="inline,thread,process")
+    args = parser.parse_args()
+
+    print(f"model={args.model or 'store:CURRENT'} requests={args.requests} concurrency={args.concurrency} workers={args.workers}")
+    print(f"{'mode':<8} {'p50(ms)':>10} {'p99(ms)':>10} {'req/s':>10}")
+    for mode in args.modes.split(","):
+        r = asyncio.run(bench_mode(mode, args.model, args.requests, args.concurrency, args.workers))
+        print(f"{r['mode']:<8} {r['p50_ms']:>10.2f} {r['p99_ms']:>10.2f} {r['rps']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# app/scripts/bench_serialization.py
+"""
+对比 /crawl-cars 列表响应的几种序列化方式（不连数据库，造一批和线上结构一样的行）：
+    uv run python -m app.scripts.bench_serialization --rows 500 --repeat 50
+- before：ORM 对象 -> CrawlVehicleOut -> jsonable_encoder -> json.dumps（以前的默认路径）
+- pydantic：ORM 对象 -> CrawlVehicleOut -> TypeAdapter.dump_json
+- after：行元组 -> dict -> orjson（现在的路径）
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.core.responses import dumps
+from app.schemas.crawl_vehicle import CrawlVehicleOut
+
+FULL_KEYS = ["source_car_id", "title", "tags", "info", "image_url", "image_path", "crawl_time"]
+
+
+def make_rows(n: int) -> list[tuple]:
+    rng = random.Random(0)
+    now = datetime.now()
+    brands = ["传祺M8", "宝马3系", "奥迪A4L", "丰田凯美瑞", "本田雅阁"]
+    rows = []
+    for i in range(n):
+        price_new = round(rng.uniform(10, 60), 2)
+        info = {
+            "上牌时间": f"{rng.randint(2012, 2024)}年{rng.randint(1, 12):02d}月",
+            "表显里程": f"{rng.randint(1, 15)}万公里",
+            "排量": rng.choice(["1.5T", "2.0T", "2.5L"]),
+            "变速箱": rng.choice(["自动", "手动"]),
+            "过户次数": f"{rng.randint(0, 3)}次",
+            "车源地": rng.choice(["广州", "北京", "上海", "成都"]),
+            "排放标准": "国VI",
+            "新车指导价": price_new,
+            "当前售价": round(price_new * rng.uniform(0.3, 0.9), 2),
+            "比新车省": round(price_new * rng.uniform(0.1, 0.7), 2),
+            "车况描述": "无重大事故，无泡水，无火烧，外观轻微剐蹭，内饰整洁，发动机变速箱工况正常",
+        }
+        rows.append((
+            str(1000000 + i),
+            f"{rng.choice(brands)} {rng.randint(2015, 2024)}款 2.0T 豪华型",
+            ["准新车", "超值", "0过户"],
+            info,
+            f"https://p.example.com/img/{i}.jpg",
+            f"data/images/{i}.jpg",
+            now - timedelta(minutes=i),
+        ))
+    return rows
+
+
+def bench(fn, repeat: int) -> tuple[float, int]:
+    fn()  # 预热
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    return (time.perf_counter() - t0) / repeat * 1000, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    objs = [SimpleNamespace(**dict(zip(FULL_KEYS, r))) for r in rows]
+    adapter = TypeAdapter(list[CrawlVehicleOut])
+    ids = [r[0] for r in rows] * 20
+
+    cases = {
+        "crawl-cars before (pydantic + jsonable_encoder + json)": lambda: json.dumps(
+            jsonable_encoder([CrawlVehicleOut.model_validate(o) for o in objs], by_alias=True),
+            ensure_ascii=False,
+        ).encode("utf-8"),
+        "crawl-cars pydantic dump_json": lambda: adapter.dump_json(
+            [CrawlVehicleOut.model_validate(o) for o in objs], by_alias=True
+        ),
+        "crawl-cars after (row tuples + orjson)": lambda: dumps([dict(zip(FULL_KEYS, r)) for r in rows]),
+        f"annotations/ids before ({len(ids)} ids, jsonable_encoder + json)": lambda: json.dumps(
+            jsonable_encoder(ids), ensure_ascii=False
+        ).encode("utf-8"),
+        f"annotations/ids after ({len(ids)} ids, orjson)": lambda: dumps(ids),
+    }
+
+    print(f"rows={args.rows} repeat={args.repeat}")
+    print(f"{'case':<62} {'ms/op':>9} {'bytes':>10}")
+    for name, fn in cases.items():
+        ms, size = bench(fn, args.repeat)
+        print(f"{name:<62} {ms:>9.2f} {size:>10}")
+
+
+if __name__ == "__main__":
+    main()
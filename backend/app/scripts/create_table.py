@@ -2,6 +2,8 @@ from app.db import engine, Base
 
 # ⚠️ 必须 import 模型，让它们注册到 Base.metadata
 from app.models.crawl_car import CrawlCar
+from app.models.crawl_car_feature import CrawlCarFeature
+from app.models.crawl_car_stat import CrawlCarStat, CrawlCarStatWatermark
 from app.models.user import User  # 如果你要 user 表，取消注释
 
 if __name__ == "__main__":
@@ -1,36 +1,187 @@
+# app/scripts/import_crawl_json.py
+"""
+把爬虫落盘的 JSON（每辆车一个文件）批量导入 crawl_cars + crawl_car_features：
+- 开始前把已有的 source_car_id 一次性读进 set，去重在内存里做，不再每个文件一次 SELECT
+- 读文件 + json.loads + 列式解析特征放在进程池里，按 PARSE_CHUNK 个文件一块，
+  在途的块数有上限，百万文件也不会把解析结果全堆在内存里
+- 主进程每 BATCH_SIZE 行一次 executemany（crawl_cars 一条、crawl_car_features 一条），
+  每 COMMIT_EVERY 行提交一次并打印 rows/s；中途失败时已提交的部分不会丢，重跑会自动跳过
+- 开始后别的进程（另一个导入）插进来的同一辆车撞唯一键时跳过（MySQL INSERT IGNORE，
+  SQLite ON CONFLICT DO NOTHING），不会让整批回滚
+- 特征行在同一个事务里分配 import_seq（按提交顺序，见 app/services/import_seq.py），
+  几个导入同时跑时，看板统计 / 增量训练的水位线不会越过还没提交的那一批
+    uv run python -m app.scripts.import_crawl_json data/crawl/json --workers 8
+"""
+import argparse
 import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import batched
 from pathlib import Path
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
 from app.db import SessionLocal
-from app.services.crawl_car_service import save_crawl_car
+from app.models.crawl_car import CrawlCar
+from app.models.crawl_car_feature import CrawlCarFeature
+from app.services.crawl_list_cache import invalidate_crawl_listing
+from app.services.crawl_stats import refresh_stats
+from app.services.features import feature_records
+from app.services.import_seq import lock_import_counter, stamp_import_seq
+
+DEFAULT_JSON_DIR = "/Users/zhiyu/Documents/Vehicle-Intelligence-Platform/backend/data/crawl/json"
+PARSE_CHUNK = 500
+BATCH_SIZE = 2000
+COMMIT_EVERY = 20000
+
+_CAR_KEYS = ["title", "source_url", "image_url", "image_path", "tags", "info", "page_no"]
+
+
+# ======================
+# 子进程：读文件 + 解析
+# ======================
+def _parse_chunk(paths: tuple[str, ...]) -> tuple[list[tuple[dict, dict]], list[str]]:
+    """返回 ([(crawl_cars 行, crawl_car_features 行)], 错误信息)"""
+    cars, errors = [], []
+    for path in paths:
+        try:
+            data = json.loads(Path(path).read_bytes())
+        except Exception as e:
+            errors.append(f"{path}: {e}")
+            continue
+        car_id = data.get("car_id") if isinstance(data, dict) else None
+        if not car_id:
+            continue
+        row = {"source_car_id": str(car_id)}
+        row.update({k: data.get(k) for k in _CAR_KEYS})
+        cars.append(row)
+
+    features = feature_records([c["title"] for c in cars], [c["info"] for c in cars]) if cars else []
+    return list(zip(cars, features)), errors
+
 
+def _iter_parsed(folder: str, workers: int):
+    paths = (str(p) for p in Path(folder).rglob("*.json"))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in batched(paths, PARSE_CHUNK):
+            pending.append(pool.submit(_parse_chunk, chunk))
+            # 在途的块数有上限：主进程写库跟不上时不再继续派发
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
 
-def import_json_folder(folder: str):
+
+# ======================
+# 主进程：去重 + 批量写入
+# ======================
+def _insert_ignore(db, model):
+    # 只会撞 crawl_cars.source_car_id / crawl_car_features 主键，这两张表没有 NOT NULL 的业务字段，
+    # IGNORE 把其他错误降级成 warning 的副作用在这里碰不到；
+    # 用 Table 走 Core 的 executemany（ORM 批量插入的结果拿不到 rowcount）
+    table = model.__table__
+    if db.get_bind().dialect.name == "mysql":
+        return insert(table).prefix_with("IGNORE")
+    # 本地 SQLite
+    return sqlite_insert(table).on_conflict_do_nothing()
+
+
+def _insert_batch(db, batch: list[tuple[dict, dict]]) -> int:
+    """返回实际插入的 crawl_cars 行数（撞唯一键跳过的不算）"""
+    # 先锁导入计数器再写任何行（持有到这一段 commit）：手里有未提交行的导入同一时间只有一个，
+    # 两个导入撞同一个 source_car_id 时不会一个等唯一键、一个等计数器互相死锁
+    lock_import_counter(db)
+    cars = [c for c, _ in batch]
+    inserted = db.execute(_insert_ignore(db, CrawlCar), cars).rowcount
+    # MySQL 没有 INSERT ... RETURNING，按唯一键把 id 查回来（一条 IN 查询）；
+    # 被跳过的行查到的是已有那一行的 id，它的特征行同样撞主键跳过
+    ids = dict(db.execute(
+        select(CrawlCar.source_car_id, CrawlCar.id)
+        .where(CrawlCar.source_car_id.in_([c["source_car_id"] for c in cars]))
+    ).all())
+    features = [{**f, "crawl_car_id": ids[c["source_car_id"]]} for c, f in batch]
+    stamp_import_seq(db, features)
+    db.execute(_insert_ignore(db, CrawlCarFeature), features)
+    return inserted
+
+
+def import_json_folder(
+    folder: str,
+    workers: int | None = None,
+    batch_size: int = BATCH_SIZE,
+    commit_every: int = COMMIT_EVERY,
+) -> int:
+    workers = workers or os.cpu_count() or 1
     db = SessionLocal()
     success = 0
     skipped = 0
+    failed = 0
+    uncommitted = 0
+    t0 = time.perf_counter()
 
     try:
-        for path in Path(folder).rglob("*.json"):
-            try:
-                data = json.loads(path.read_text(encoding="utf-8"))
-                ok = save_crawl_car(db, data)
-                if ok:
-                    success += 1
-                else:
+        seen = set(db.scalars(select(CrawlCar.source_car_id)))
+        print(f"... 已有 {len(seen)} 条，{workers} 个解析进程")
+
+        batch: list[tuple[dict, dict]] = []
+        for parsed, errors in _iter_parsed(folder, workers):
+            for e in errors:
+                print(f"[ERROR] {e}")
+            failed += len(errors)
+
+            for car, feature in parsed:
+                sid = car["source_car_id"]
+                if sid in seen:
                     skipped += 1
+                    continue
+                seen.add(sid)
+                batch.append((car, feature))
+
+                if len(batch) >= batch_size:
+                    inserted = _insert_batch(db, batch)
+                    success += inserted
+                    skipped += len(batch) - inserted
+                    uncommitted += len(batch)
+                    batch = []
+                    if uncommitted >= commit_every:
+                        db.commit()
+                        uncommitted = 0
+                        elapsed = time.perf_counter() - t0
+                        print(f"... {success} 条，{success / elapsed:.0f} rows/s")
 
-            except Exception as e:
-                print(f"[ERROR] {path}: {e}")
+        if batch:
+            inserted = _insert_batch(db, batch)
+            success += inserted
+            skipped += len(batch) - inserted
+        db.commit()
 
-        db.commit()   # 🔥🔥🔥 关键就在这
+        if success:
+            invalidate_crawl_listing()
+            # 看板统计只累加这次新导入的行
+            refresh_stats(db)
     except Exception:
         db.rollback()
         raise
     finally:
         db.close()
 
-    print(f"✅ 成功插入 {success} 条，跳过 {skipped} 条")
+    elapsed = time.perf_counter() - t0
+    print(
+        f"✅ 成功插入 {success} 条，跳过 {skipped} 条，失败 {failed} 个文件，"
+        f"用时 {elapsed:.1f}s（{success / elapsed if elapsed else 0:.0f} rows/s）"
+    )
+    return success
 
 
 if __name__ == "__main__":
-    import_json_folder("/Users/zhiyu/Documents/Vehicle-Intelligence-Platform/backend/data/crawl/json")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("folder", nargs="?", default=DEFAULT_JSON_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="解析进程数，默认 CPU 核数")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--commit-every", type=int, default=COMMIT_EVERY)
+    args = parser.parse_args()
+    import_json_folder(args.folder, args.workers, args.batch_size, args.commit_every)
@@ -0,0 +1,132 @@
+# app/services/annotation_service.py
+"""
+批量标注（POST /annotations/bulk）：
+- 一个事务、一条多行 INSERT ... ON DUPLICATE KEY UPDATE id = id（靠 cars.source_car_id 唯一键去重），
+  不用逐条 SELECT + INSERT + commit
+- 不用 INSERT IGNORE：它会把 NOT NULL / 类型错误也降级成 warning，悄悄写进默认值
+- 插入前 SELECT ... FOR UPDATE 锁住这批 id（InnoDB 唯一索引上的记录锁 / 间隙锁），
+  并发提交同一批车时后到的事务会等前一个提交，返回的 created / duplicate 是准的
+- 同一个事务里分配 cars.sync_seq（见 annotation_sync.py），增量同步按提交顺序拿得到
+- 同一个事务里把 crawl_cars.is_annotated 置 1，标注和列表上的状态一起生效或一起回滚
+- cars 里 NOT NULL 的字段（brand / model / year）缺了的条目插入前就挑出来标成 error，
+  不让一条坏数据把整批回滚
+"""
+from sqlalchemy import select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.car import Car
+from app.models.crawl_car import CrawlCar
+from app.schemas import CarAnnotationCreate
+from app.services.annotation_sync import allocate_sync_seq, lock_sync_counter
+from app.services.crawl_list_cache import invalidate_crawl_listing
+
+STATUS_CREATED = "created"
+STATUS_DUPLICATE = "duplicate"
+STATUS_ERROR = "error"
+
+# CarAnnotationCreate 里可选、但 cars 表里 NOT NULL 的字段
+REQUIRED_FIELDS = ("brand", "model", "year")
+
+
+def missing_fields(item: CarAnnotationCreate) -> list[str]:
+    return [f for f in REQUIRED_FIELDS if getattr(item, f) is None]
+
+
+def _upsert_stmt(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "mysql":
+        stmt = mysql_insert(Car)
+        # 撞唯一键时什么都不改（id = cars.id），其他错误照常报
+        return stmt.on_duplicate_key_update(id=Car.id)
+    # 本地 SQLite
+    return sqlite_insert(Car).on_conflict_do_nothing(index_elements=["source_car_id"])
+
+
+def mark_annotated(db: Session, source_car_ids: list[str]) -> int:
+    """
+    在调用方的事务里把 crawl_cars.is_annotated 置 1（不提交），返回实际改动的行数；
+    单条 / 批量标注都走这里，提交后有改动要调 invalidate_crawl_listing
+    """
+    if not source_car_ids:
+        return 0
+    return db.execute(
+        update(CrawlCar)
+        .where(CrawlCar.source_car_id.in_(source_car_ids), CrawlCar.is_annotated != 1)
+        .values(is_annotated=1)
+    ).rowcount
+
+
+def _error_status(item: CarAnnotationCreate) -> dict:
+    return {
+        "source_car_id": item.source_car_id,
+        "status": STATUS_ERROR,
+        "detail": f"缺少必填字段: {', '.join(missing_fields(item))}",
+    }
+
+
+def bulk_create_annotations(db: Session, items: list[CarAnnotationCreate]) -> list[dict]:
+    """
+    返回和 items 一一对应的 [{"source_car_id", "status"}]，status 为 created / duplicate / error
+    （error 多一个 detail）；同一批里重复的 id 只有第一条有效的算 created
+    """
+    # 批内去重，保留第一条字段齐全的
+    first: dict[str, CarAnnotationCreate] = {}
+    for item in items:
+        if not missing_fields(item):
+            first.setdefault(item.source_car_id, item)
+    ids = list(first)
+    if not ids:
+        return [_error_status(item) for item in items]
+
+    try:
+        # 先锁同步计数器（所有写 cars 的路径都先锁它），再锁这批 id
+        counter = lock_sync_counter(db)
+        existing = set(db.scalars(
+            select(Car.source_car_id).where(Car.source_car_id.in_(ids)).with_for_update()
+        ))
+        rows = [
+            {
+                "source_car_id": sid,
+                "price_wan": item.price_wan,
+                "brand": item.brand,
+                "model": item.model,
+                "year": item.year,
+                "displacement": item.displacement,
+                "gearbox": item.gearbox,
+                "transfer_count": item.transfer_count,
+                "city": item.city,
+            }
+            for sid, item in first.items()
+            if sid not in existing
+        ]
+        if rows:
+            first_seq = allocate_sync_seq(counter, len(rows))
+            for i, row in enumerate(rows):
+                row["sync_seq"] = first_seq + i
+            db.execute(_upsert_stmt(db), rows)
+
+        # 重复的也一起置 1：cars 里已经有了，crawl_cars 上的状态以它为准
+        marked = mark_annotated(db, ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if marked:
+        # /crawl-cars 的响应缓存 / ETag 作废（annotated 过滤结果变了）
+        invalidate_crawl_listing()
+
+    created = {r["source_car_id"] for r in rows}
+    out = []
+    for item in items:
+        sid = item.source_car_id
+        if missing_fields(item):
+            out.append(_error_status(item))
+        elif sid in created:
+            out.append({"source_car_id": sid, "status": STATUS_CREATED})
+            created.discard(sid)
+        else:
+            out.append({"source_car_id": sid, "status": STATUS_DUPLICATE})
+    return out
@@ -0,0 +1,115 @@
+# app/services/annotation_sync.py
+"""
+已标注 id 的增量同步（替代每次整表下载 /annotations/ids）：
+- 版本号是 cars.sync_seq（提交顺序的序号），不是自增 id：
+  自增 id 在 INSERT 时就分配了，两个标注事务交叉时，小 id 可能在客户端已经越过它之后才提交，
+  按 id > since 取增量会永远漏掉这一行
+- 每个标注事务先 SELECT ... FOR UPDATE 锁住 car_sync_counters 那一行，给自己的行分配连续的序号，
+  锁一直持有到提交；序号大的事务一定在序号小的事务提交之后才分配，所以已提交的序号总是一段连续前缀
+- /annotations/ids/changes?since=version 只查 sync_seq > version 的几行（索引范围扫描），
+  耗时和返回体只跟新增的标注数有关
+- /annotations/ids/snapshot 首次加载用：source_car_id 排序后差分编码（懂车帝的 id 是数字串，
+  相邻差值比原值短得多），非纯数字的 id 原样放在 others 里
+- cars 没有删除路径；表被清空 / 换库后客户端的 since 会比当前版本大，这时返回 reset=true
+"""
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.car import Car, CarSyncCounter
+
+CHANGES_DEFAULT_LIMIT = 5000
+CHANGES_MAX_LIMIT = 50000
+# 浏览器里 number 能精确表示的最大整数，超过的 id 前缀和会丢精度，放进 others
+MAX_SAFE_INTEGER = 2**53 - 1
+SYNC_COUNTER_NAME = "cars"
+
+
+def lock_sync_counter(db: Session, name: str = SYNC_COUNTER_NAME, seq_column=Car.sync_seq) -> CarSyncCounter:
+    """
+    标注事务一开始就调用（在锁 cars 的行之前，所有写 cars 的路径加锁顺序一致，不会互相死锁），
+    行锁持有到调用方 commit / rollback；
+    导入 crawl_car_features 也用同一张计数器表（name / seq_column 见 import_seq.py）
+    """
+    counter = db.scalars(
+        select(CarSyncCounter).where(CarSyncCounter.name == name).with_for_update()
+    ).first()
+    if counter is None:
+        counter = CarSyncCounter(
+            name=name,
+            value=db.scalar(select(func.max(seq_column))) or 0,
+        )
+        db.add(counter)
+        db.flush()
+    return counter
+
+
+def allocate_sync_seq(counter: CarSyncCounter, n: int) -> int:
+    """分配 n 个连续序号，返回第一个"""
+    first = counter.value + 1
+    counter.value += n
+    return first
+
+
+def current_version(db: Session) -> int:
+    # 已提交的序号是连续前缀，最大值就是当前版本
+    return db.scalar(select(func.max(Car.sync_seq))) or 0
+
+
+def annotated_changes(db: Session, since: int, limit: int = CHANGES_DEFAULT_LIMIT) -> dict:
+    version = current_version(db)
+    if since > version:
+        # 客户端的版本比服务端还新：表被清过 / 换过库，让客户端重新拉快照
+        return {"version": version, "ids": [], "has_more": False, "reset": True}
+
+    rows = db.execute(
+        select(Car.sync_seq, Car.source_car_id)
+        .where(Car.sync_seq > since)
+        .order_by(Car.sync_seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        # 没翻完时版本只推进到这一页最后一行，客户端拿它接着请求
+        "version": rows[-1].sync_seq if rows else since,
+        "ids": [r.source_car_id for r in rows],
+        "has_more": has_more,
+        "reset": False,
+    }
+
+
+def _is_canonical_int(s: str) -> bool:
+    # "0123" 这种转成整数再转回来会变，不能差分
+    return s.isascii() and s.isdigit() and (s == "0" or not s.startswith("0")) and int(s) <= MAX_SAFE_INTEGER
+
+
+def encode_id_snapshot(ids: list[str]) -> dict:
+    """排序 + 差分：deltas[0] 是最小的 id，之后每个是和前一个的差；客户端前缀和还原"""
+    numeric = [s for s in ids if _is_canonical_int(s)]
+    others = sorted(s for s in ids if not _is_canonical_int(s))
+
+    arr = np.sort(np.asarray(numeric, dtype=np.int64))
+    deltas = np.diff(arr, prepend=0) if len(arr) else arr
+    return {
+        "encoding": "sorted-delta",
+        "count": len(ids),
+        "deltas": deltas,
+        "others": others,
+    }
+
+
+def decode_id_snapshot(snapshot: dict) -> list[str]:
+    values = np.cumsum(np.asarray(snapshot["deltas"], dtype=np.int64))
+    return [str(v) for v in values.tolist()] + list(snapshot["others"])
+
+
+def annotated_snapshot(db: Session, version: Optional[int] = None) -> dict:
+    version = current_version(db) if version is None else version
+    # 只取 sync_seq <= version 的行，和返回的版本号对齐（中途新提交的留给 changes）
+    ids = db.scalars(select(Car.source_car_id).where(Car.sync_seq <= version)).all()
+    snapshot = encode_id_snapshot([s for s in ids if s is not None])
+    snapshot["version"] = version
+    return snapshot
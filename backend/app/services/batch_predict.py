@@ -0,0 +1,133 @@
+# app/services/batch_predict.py
+"""
+批量预测：
+- 逐行做 pydantic 校验，坏行单独报错，不影响整批
+- 合法行拼成一个 DataFrame，整块调用一次 model.predict
+- 按输入顺序输出结果（NDJSON，一行一条）
+"""
+import json
+import math
+from typing import Any, AsyncIterable, AsyncIterator
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+
+from app.core.responses import dumps
+from app.schemas.predict import CarPredictIn
+from app.services.features import FEATURE_COLUMNS
+from app.services.model_registry import registry
+
+# 每块多少行调用一次 predict：越大越快，但单块占用内存也越大
+BATCH_CHUNK_SIZE = 5000
+
+
+def parse_json_array(body: bytes) -> list[Any]:
+    rows = json.loads(body)
+    if not isinstance(rows, list):
+        raise ValueError("请求体必须是 JSON 数组")
+    return rows
+
+
+async def aiter_rows(rows: list[Any]) -> AsyncIterator[Any]:
+    for r in rows:
+        yield r
+
+
+def _parse_ndjson_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        # 交给下游按“坏行”处理，保证行号对齐
+        return _BadLine(str(e))
+
+
+class _BadLine:
+    def __init__(self, error: str):
+        self.error = error
+
+
+async def aiter_ndjson_rows(body: bytes) -> AsyncIterator[Any]:
+    """NDJSON：按行惰性解析，坏行单独报错"""
+    for line in body.splitlines():
+        if line.strip():
+            yield _parse_ndjson_line(line)
+
+
+def _validate(raw: Any) -> tuple[dict | None, str | None]:
+    if isinstance(raw, _BadLine):
+        return None, f"JSON 解析失败: {raw.error}"
+    try:
+        return CarPredictIn.model_validate(raw).model_dump(), None
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+        )
+
+
+def predict_chunk(model, raw_rows: list[Any], start: int) -> list[dict]:
+    """对一块原始输入做校验 + 一次向量化预测，返回与输入同序的结果"""
+    results: list[dict] = [None] * len(raw_rows)  # type: ignore[list-item]
+    valid_idx = []
+    valid_rows = []
+
+    for i, raw in enumerate(raw_rows):
+        row, error = _validate(raw)
+        if error is not None:
+            results[i] = {"index": start + i, "error": error}
+        else:
+            valid_idx.append(i)
+            valid_rows.append(row)
+
+    if valid_rows:
+        X = pd.DataFrame(valid_rows, columns=FEATURE_COLUMNS)
+        try:
+            preds = model.predict(X)
+        except Exception as e:
+            # 整块失败时逐行兜底，把出错的行挑出来
+            preds = []
+            for row in valid_rows:
+                try:
+                    preds.append(float(model.predict(pd.DataFrame([row], columns=FEATURE_COLUMNS))[0]))
+                except Exception as row_err:
+                    preds.append(row_err)
+
+        for i, y in zip(valid_idx, preds):
+            if isinstance(y, Exception):
+                results[i] = {"index": start + i, "error": str(y)}
+            elif not math.isfinite(float(y)):
+                results[i] = {"index": start + i, "error": "预测结果不是有限数"}
+            else:
+                results[i] = {"index": start + i, "predicted_price": round(float(y), 2)}
+
+    return results
+
+
+async def stream_predictions(rows: AsyncIterable[Any], chunk_size: int = BATCH_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    # 整个批次固定用同一个模型版本，避免中途热更新导致前后结果不一致；
+    # get() / 第一次取 .model 都可能读文件，放到线程池里，不阻塞事件循环
+    loaded = await run_in_threadpool(registry.get)
+    model = await run_in_threadpool(lambda: loaded.model)
+    start = 0
+    chunk: list[Any] = []
+
+    async def flush(chunk: list[Any], start: int) -> list[bytes]:
+        # predict 是 CPU 活，丢到线程池里跑，不阻塞事件循环
+        results = await run_in_threadpool(predict_chunk, model, chunk, start)
+        lines = []
+        for r in results:
+            r["model_version"] = loaded.version
+            lines.append(dumps(r) + b"\n")
+        return lines
+
+    async for raw in rows:
+        chunk.append(raw)
+        if len(chunk) >= chunk_size:
+            for line in await flush(chunk, start):
+                yield line
+            start += len(chunk)
+            chunk = []
+
+    if chunk:
+        for line in await flush(chunk, start):
+            yield line
@@ -0,0 +1,132 @@
+# app/services/compiled_model.py
+"""
+把训练好的 Pipeline(ColumnTransformer(OneHotEncoder) + LinearRegression)
+“编译”成一张打分表：
+    price = intercept + Σ 数值特征 * 系数 + Σ 类别特征取值对应的系数
+线上预测只做几次加减乘，不用再构造 DataFrame / 走 sklearn 的通用 transform。
+"""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional
+
+import numpy as np
+
+# 编译结果和 sklearn 预测允许的最大误差（万）
+PARITY_TOLERANCE = 1e-6
+
+
+class NotCompilableError(ValueError):
+    """模型结构不是 ColumnTransformer + 线性回归，无法编译"""
+
+
+@dataclass
+class ScoringTable:
+    intercept: float
+    num_coef: dict[str, float]
+    cat_coef: dict[str, dict[str, float]] = field(default_factory=dict)
+
+    def score(self, row: Mapping[str, Any]) -> float:
+        y = self.intercept
+        for col, w in self.num_coef.items():
+            y += float(row[col]) * w
+        for col, table in self.cat_coef.items():
+            # OneHotEncoder(handle_unknown="ignore")：没见过的取值贡献为 0
+            y += table.get(str(row[col]), 0.0)
+        return y
+
+    def to_dict(self) -> dict:
+        return {
+            "intercept": self.intercept,
+            "num_coef": self.num_coef,
+            "cat_coef": self.cat_coef,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ScoringTable":
+        return cls(
+            intercept=float(d["intercept"]),
+            num_coef={k: float(v) for k, v in d["num_coef"].items()},
+            cat_coef={
+                col: {k: float(v) for k, v in table.items()}
+                for col, table in d["cat_coef"].items()
+            },
+        )
+
+
+def compile_pipeline(model) -> ScoringTable:
+    try:
+        pre = model.named_steps["preprocess"]
+        reg = model.named_steps["reg"]
+    except (AttributeError, KeyError):
+        raise NotCompilableError("不是 preprocess + reg 结构的 Pipeline")
+
+    if not hasattr(reg, "coef_") or np.ndim(reg.coef_) != 1:
+        raise NotCompilableError(f"回归器 {type(reg).__name__} 不是单输出线性模型")
+
+    coef = np.asarray(reg.coef_, dtype=float)
+    # LinearRegression 的 intercept_ 是标量，SGDRegressor 的是长度 1 的数组
+    intercept = float(np.ravel(reg.intercept_)[0])
+    num_coef: dict[str, float] = {}
+    cat_coef: dict[str, dict[str, float]] = {}
+    offset = 0
+
+    for name, trans, cols in pre.transformers_:
+        if name == "remainder" and trans == "drop":
+            continue
+
+        if name == "num":
+            # passthrough 没有 mean_ / scale_；StandardScaler 的话把缩放折进系数里：
+            # w * (x - mean) / scale = (w / scale) * x - w * mean / scale
+            means = getattr(trans, "mean_", None)
+            scales = getattr(trans, "scale_", None)
+            for i, col in enumerate(cols):
+                w = float(coef[offset])
+                if scales is not None:
+                    w /= float(scales[i])
+                if means is not None:
+                    intercept -= w * float(means[i])
+                num_coef[col] = w
+                offset += 1
+            continue
+
+        if name == "cat":
+            if getattr(trans, "drop_idx_", None) is not None:
+                raise NotCompilableError("暂不支持 OneHotEncoder(drop=...)")
+            for col, categories in zip(cols, trans.categories_):
+                table = {}
+                for cat in categories:
+                    table[str(cat)] = float(coef[offset])
+                    offset += 1
+                cat_coef[col] = table
+            continue
+
+        raise NotCompilableError(f"未知的预处理步骤: {name}")
+
+    if offset != len(coef):
+        raise NotCompilableError(f"特征数不一致: 展开 {offset} 列，模型 {len(coef)} 个系数")
+
+    return ScoringTable(
+        intercept=intercept,
+        num_coef=num_coef,
+        cat_coef=cat_coef,
+    )
+
+
+def check_parity(table: ScoringTable, model, X) -> float:
+    """
+    在给定数据（一般就是训练集）上比较编译结果和 model.predict，
+    返回最大绝对误差；超过 PARITY_TOLERANCE 直接抛异常。
+    """
+    expected = model.predict(X)
+    actual = np.array([table.score(row) for row in X.to_dict(orient="records")])
+    max_err = float(np.max(np.abs(expected - actual))) if len(actual) else 0.0
+    if not math.isfinite(max_err) or max_err > PARITY_TOLERANCE:
+        raise AssertionError(f"编译模型与 sklearn 预测不一致: max_abs_err={max_err}")
+    return max_err
+
+
+def try_compile(model) -> Optional[ScoringTable]:
+    try:
+        return compile_pipeline(model)
+    except NotCompilableError:
+        return None
@@ -0,0 +1,229 @@
+# app/services/crawl_car_query.py
+"""
+/crawl-cars 的过滤 + 游标（keyset）分页：
+- 排序固定为 (crawl_time DESC, id DESC)，id 兜底保证顺序唯一
+- 下一页用上一页最后一行的 (crawl_time, id) 做条件，
+  直接在 ix_crawl_cars_crawl_time_id 上定位，第 1000 页和第 1 页一样快（OFFSET 要先扫过前面所有行）
+- 价格走 crawl_cars 上的生成列（ix_crawl_cars_price_used），品牌 / 城市走 crawl_car_features，
+  都不碰 info JSON
+- fields= / view=summary 时只 select 需要的列，不再整行加载 info / tags JSON
+- 标注状态（is_annotated）和标注价（cars.price_wan，按唯一键 source_car_id outer join）同一条查询带出来
+"""
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from sqlalchemy import and_, or_, select
+
+from app import models
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+@dataclass
+class CrawlCarFilters:
+    brand: Optional[str] = None
+    price_min: Optional[float] = None
+    price_max: Optional[float] = None
+    city: Optional[str] = None
+    annotated: Optional[bool] = None
+    crawl_date: Optional[date] = None
+
+    @property
+    def needs_features(self) -> bool:
+        return self.brand is not None or self.city is not None
+
+
+def crawl_car_filters(
+    brand: Optional[str] = Query(None, description="品牌（标题第一个词），精确匹配"),
+    price_min: Optional[float] = Query(None, ge=0, description="当前售价下限（万）"),
+    price_max: Optional[float] = Query(None, ge=0, description="当前售价上限（万）"),
+    city: Optional[str] = Query(None, description="车源地"),
+    annotated: Optional[bool] = Query(None, description="是否已标注"),
+    crawl_date: Optional[date] = Query(None, description="抓取日期 YYYY-MM-DD"),
+) -> CrawlCarFilters:
+    # 当成 FastAPI 依赖用：列表 / 导出等接口共用同一套过滤参数
+    return CrawlCarFilters(brand, price_min, price_max, city, annotated, crawl_date)
+
+
+def apply_filters(query, filters: CrawlCarFilters, features_joined: bool = False):
+    """
+    query 是以 CrawlCar 为主表的 select；
+    features_joined=True 表示调用方已经 join 过 crawl_car_features（字段投影时），不再重复 join
+    """
+    CrawlCar, Feature = models.CrawlCar, models.CrawlCarFeature
+
+    if filters.needs_features:
+        if not features_joined:
+            query = query.join(Feature, Feature.crawl_car_id == CrawlCar.id)
+        if filters.brand is not None:
+            query = query.where(Feature.brand == filters.brand)
+        if filters.city is not None:
+            query = query.where(Feature.city == filters.city)
+
+    if filters.price_min is not None:
+        query = query.where(CrawlCar.price_used >= filters.price_min)
+    if filters.price_max is not None:
+        query = query.where(CrawlCar.price_used <= filters.price_max)
+
+    if filters.annotated is not None:
+        query = query.where(CrawlCar.is_annotated == (1 if filters.annotated else 0))
+
+    if filters.crawl_date is not None:
+        # 用范围而不是 DATE(crawl_time) = ...，才能走 crawl_time 上的索引
+        start = datetime.combine(filters.crawl_date, time.min)
+        query = query.where(CrawlCar.crawl_time >= start, CrawlCar.crawl_time < start + timedelta(days=1))
+
+    return query
+
+
+# ======================
+# 字段投影
+# ======================
+_CAR_FIELDS = [
+    "id", "source_car_id", "title", "source_url", "image_url", "image_path",
+    "tags", "info", "page_no", "crawl_time", "is_annotated",
+]
+_FEATURE_FIELDS = [
+    "brand", "plate_year", "engine", "gearbox", "transfer_cnt", "price_new", "price_used", "city",
+]
+# 来自 cars（标注表）的字段：输出名 -> 列
+_ANNOTATION_FIELDS = {
+    "annotated_price": models.Car.price_wan,
+}
+PROJECTABLE_FIELDS = _CAR_FIELDS + _FEATURE_FIELDS + list(_ANNOTATION_FIELDS)
+
+# 列表 / 图表页用的精简字段：全是标量，不含 info / tags
+SUMMARY_FIELDS = [
+    "source_car_id", "title", "crawl_time", "is_annotated", "annotated_price",
+    "brand", "plate_year", "price_new", "price_used", "city",
+]
+
+
+def _join_annotations(stmt):
+    # cars.source_car_id 唯一索引，每行最多命中一条；没标注的为 null
+    return stmt.outerjoin(models.Car, models.Car.source_car_id == models.CrawlCar.source_car_id)
+
+
+def parse_fields(fields: Optional[str], view: str) -> Optional[list[str]]:
+    """返回要输出的字段列表；None 表示完整的 CrawlVehicleOut"""
+    if fields:
+        names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in names if f not in PROJECTABLE_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"未知字段: {', '.join(unknown)}（可选: {', '.join(PROJECTABLE_FIELDS)}）",
+            )
+        return names
+    if view == "summary":
+        return list(SUMMARY_FIELDS)
+    return None
+
+
+def projection_select(names: list[str]):
+    """
+    只 select 需要的列；id / crawl_time 总是带上（游标要用），输出时再按 names 挑。
+    用到特征列时 outer join crawl_car_features（还没回填的行特征为 null），
+    用到标注字段时 outer join cars。
+    返回 (select, 是否 join 了特征表)
+    """
+    CrawlCar, Feature = models.CrawlCar, models.CrawlCarFeature
+    cols = [CrawlCar.id, CrawlCar.crawl_time]
+    cols += [getattr(CrawlCar, n) for n in names if n in _CAR_FIELDS and n not in ("id", "crawl_time")]
+    feature_names = [n for n in names if n in _FEATURE_FIELDS]
+    cols += [getattr(Feature, n) for n in feature_names]
+    annotation_names = [n for n in names if n in _ANNOTATION_FIELDS]
+    cols += [_ANNOTATION_FIELDS[n].label(n) for n in annotation_names]
+
+    stmt = select(*cols).select_from(CrawlCar)
+    if feature_names:
+        stmt = stmt.outerjoin(Feature, Feature.crawl_car_id == CrawlCar.id)
+    if annotation_names:
+        stmt = _join_annotations(stmt)
+    return stmt, bool(feature_names)
+
+
+def project_rows(rows: list, names: list[str]) -> list[dict]:
+    # datetime 原样留着，交给 orjson 输出 ISO 格式
+    out = []
+    for r in rows:
+        m = r._mapping
+        out.append({n: m[n] for n in names})
+    return out
+
+
+# 完整模式（CrawlVehicleOut）的字段：输出名 -> 列，直接从行元组拼 dict，不逐行构造 pydantic 模型
+FULL_VIEW_COLUMNS = {
+    "source_car_id": models.CrawlCar.source_car_id,
+    "title": models.CrawlCar.title,
+    "tags": models.CrawlCar.tags,
+    "info": models.CrawlCar.info,
+    "image_url": models.CrawlCar.image_url,
+    "image_path": models.CrawlCar.image_path,
+    "crawl_time": models.CrawlCar.crawl_time,
+    "is_annotated": models.CrawlCar.is_annotated,
+    "annotated_price": models.Car.price_wan,
+}
+
+
+def full_view_select():
+    # id 给游标用，不输出
+    stmt = select(models.CrawlCar.id, *FULL_VIEW_COLUMNS.values()).select_from(models.CrawlCar)
+    return _join_annotations(stmt)
+
+
+def full_view_rows(rows: list) -> list[dict]:
+    keys = list(FULL_VIEW_COLUMNS)
+    # 第 0 列是 id
+    return [dict(zip(keys, r[1:])) for r in rows]
+
+
+# ======================
+# 游标
+# ======================
+def encode_cursor(crawl_time: Optional[datetime], car_id: int) -> str:
+    raw = json.dumps({"t": crawl_time.isoformat() if crawl_time else None, "id": car_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[datetime], int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        t = datetime.fromisoformat(data["t"]) if data["t"] else None
+        return t, int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="cursor 无效")
+
+
+def apply_keyset(query, cursor: Optional[str]):
+    """按 (crawl_time DESC, id DESC) 排序，并从 cursor 之后继续"""
+    CrawlCar = models.CrawlCar
+
+    if cursor:
+        t, car_id = decode_cursor(cursor)
+        if t is None:
+            # 上一页已经翻到 crawl_time 为 NULL 的尾巴（DESC 时 NULL 排最后）
+            query = query.where(CrawlCar.crawl_time.is_(None), CrawlCar.id < car_id)
+        else:
+            # 展开写而不是 (crawl_time, id) < (t, id)：MySQL 对行构造器比较不一定能用上索引范围扫描
+            query = query.where(or_(
+                CrawlCar.crawl_time < t,
+                and_(CrawlCar.crawl_time == t, CrawlCar.id < car_id),
+                CrawlCar.crawl_time.is_(None),
+            ))
+
+    return query.order_by(CrawlCar.crawl_time.desc(), CrawlCar.id.desc())
+
+
+def next_cursor(rows: list, limit: int) -> Optional[str]:
+    # 多取一行判断有没有下一页，调用方负责把第 limit+1 行去掉
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor(last.crawl_time, last.id)
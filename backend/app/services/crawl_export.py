@@ -0,0 +1,174 @@
+# app/services/crawl_export.py
+"""
+/crawl-cars/export 的流式导出（NDJSON / CSV / Parquet）：
+- 服务端游标（stream_results，MySQL 上是 pymysql 的 SSCursor）按 EXPORT_CHUNK_SIZE 一块一块取，
+  每块编码完就交给 StreamingResponse 发出去，内存只和块大小有关，和导出多少行无关
+- 过滤参数和列表接口同一套（CrawlCarFilters），按 id 升序输出
+- Parquet 每块写成一个 row group，写完就把缓冲区里的字节吐出去；pyarrow 是可选依赖（extra: export）
+"""
+import csv
+import io
+import json
+import os
+from collections.abc import Iterator
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app import models
+from app.core.responses import dumps
+from app.db import SessionLocal
+from app.services.crawl_car_query import (
+    PROJECTABLE_FIELDS,
+    CrawlCarFilters,
+    apply_filters,
+    parse_fields,
+    projection_select,
+)
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "5000"))
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# 这两列是 JSON，CSV / Parquet 里存成 JSON 字符串
+_JSON_FIELDS = {"tags", "info"}
+
+
+def export_fields(fields: Optional[str]) -> list[str]:
+    # 默认导出全部字段（crawl_cars + crawl_car_features）
+    return parse_fields(fields, "full") or list(PROJECTABLE_FIELDS)
+
+
+def _iter_chunks(filters: CrawlCarFilters, names: list[str], chunk_size: int) -> Iterator[list]:
+    stmt, features_joined = projection_select(names)
+    stmt = apply_filters(stmt, filters, features_joined).order_by(models.CrawlCar.id)
+
+    # 独立的 session：导出期间这条连接一直被未读完的游标占着，不能和请求里的 session 共用，
+    # 而且 StreamingResponse 的生成器在路由函数返回之后才开始跑
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=chunk_size))
+        for rows in result.partitions():
+            yield rows
+    finally:
+        db.close()
+
+
+def _json_text(value) -> Optional[str]:
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+
+def _ndjson(chunks: Iterator[list], names: list[str]) -> Iterator[bytes]:
+    for rows in chunks:
+        yield b"".join(dumps({n: r._mapping[n] for n in names}) + b"\n" for r in rows)
+
+
+def _csv(chunks: Iterator[list], names: list[str]) -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    # 带 BOM，Excel 直接打开中文不乱码
+    buf.write("\ufeff")
+    writer.writerow(names)
+    for rows in chunks:
+        for r in rows:
+            m = r._mapping
+            writer.writerow([
+                _json_text(m[n]) if n in _JSON_FIELDS
+                else m[n].isoformat() if n == "crawl_time" and m[n] is not None
+                else m[n]
+                for n in names
+            ])
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _DrainableSink(io.RawIOBase):
+    """给 ParquetWriter 用的输出：写进来的字节攒在内存里，每个 row group 写完取走"""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        data = bytes(b)
+        self._parts.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet_schema(pa, names: list[str]):
+    types = {
+        "id": pa.int64(),
+        "page_no": pa.int64(),
+        "is_annotated": pa.int8(),
+        "plate_year": pa.int64(),
+        "transfer_cnt": pa.int64(),
+        "engine": pa.float64(),
+        "price_new": pa.float64(),
+        "price_used": pa.float64(),
+        "annotated_price": pa.float64(),
+        "crawl_time": pa.timestamp("us"),
+    }
+    return pa.schema([(n, types.get(n, pa.string())) for n in names])
+
+
+def _parquet(chunks: Iterator[list], names: list[str]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(pa, names)
+    sink = _DrainableSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in chunks:
+            columns = {n: [] for n in names}
+            for r in rows:
+                m = r._mapping
+                for n in names:
+                    columns[n].append(_json_text(m[n]) if n in _JSON_FIELDS else m[n])
+            writer.write_table(pa.table(columns, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    # footer（元数据）在 close 时才写
+    yield sink.drain()
+
+
+def check_format(fmt: str) -> None:
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise HTTPException(status_code=501, detail="导出 parquet 需要安装 pyarrow（uv sync --extra export）")
+
+
+def stream_export(
+    filters: CrawlCarFilters,
+    names: list[str],
+    fmt: str = "ndjson",
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    chunks = _iter_chunks(filters, names, chunk_size)
+    if fmt == "csv":
+        return _csv(chunks, names)
+    if fmt == "parquet":
+        return _parquet(chunks, names)
+    return _ndjson(chunks, names)
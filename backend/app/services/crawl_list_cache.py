@@ -0,0 +1,115 @@
+# app/services/crawl_list_cache.py
+"""
+/crawl-cars 的条件 GET + 进程内响应缓存：
+- 表版本 = MAX(id) + MAX(crawl_time) + MAX(crawl_car_features.import_seq) + MAX(cars.id)，
+  全部从数据库读，都走主键 / 索引两端，O(1)；多个 worker、重启前后同样的数据 ETag 也一样
+  导入新数据时 MAX(id) 会变；回填特征（summary 视图里的字段）时 MAX(import_seq) 会变；
+  新增标注时 MAX(cars.id) 会变（列表里带标注状态 / 标注价，cars 只追加）
+- 本进程里入库 / 标注后 invalidate_crawl_listing 只是清空进程内缓存（旧版本的条目不会再被命中，提前腾内存）
+- ETag = hash(表版本 + 规范化后的查询参数)，同一个版本下同一个查询的响应体是确定的
+- 缓存的是序列化好的 JSON 字节，命中时不查数据、不过 pydantic
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+CRAWL_LIST_CACHE_SIZE = int(os.getenv("CRAWL_LIST_CACHE_SIZE", "256"))
+
+
+def table_version(db: Session) -> str:
+    max_id, max_time, max_import_seq, max_annotation_id = db.execute(
+        select(
+            func.max(models.CrawlCar.id),
+            func.max(models.CrawlCar.crawl_time),
+            select(func.max(models.CrawlCarFeature.import_seq)).scalar_subquery(),
+            select(func.max(models.Car.id)).scalar_subquery(),
+        )
+    ).one()
+    return (
+        f"{max_id or 0}:{max_time.isoformat() if max_time else '-'}"
+        f":{max_import_seq or 0}:{max_annotation_id or 0}"
+    )
+
+
+def normalize_query(query_string: str) -> str:
+    # 参数顺序不同但含义相同的请求共用一个缓存项 / ETag
+    return urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+
+
+def make_etag(version: str, query: str) -> str:
+    digest = hashlib.sha1(f"{version}|{query}".encode("utf-8")).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match 可能是逗号分隔的多个 ETag，弱校验前缀 W/ 也算
+    return etag in {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+
+
+@dataclass(frozen=True)
+class CachedPage:
+    body: bytes
+    next_cursor: Optional[str]
+
+
+class CrawlListCache:
+    def __init__(self, maxsize: int = CRAWL_LIST_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict[str, CachedPage] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str) -> Optional[CachedPage]:
+        with self._lock:
+            page = self._data.get(etag)
+            if page is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(etag)
+            self.hits += 1
+            return page
+
+    def set(self, etag: str, page: CachedPage) -> None:
+        with self._lock:
+            self._data[etag] = page
+            self._data.move_to_end(etag)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+            nbytes = sum(len(p.body) for p in self._data.values())
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "bytes": nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+crawl_list_cache = CrawlListCache()
+
+
+def invalidate_crawl_listing() -> None:
+    """有新的抓取数据入库（或已有行被修改，比如标注状态）时调用"""
+    crawl_list_cache.clear()
@@ -0,0 +1,242 @@
+# app/services/crawl_stats.py
+"""
+看板统计（/stats/*）的预聚合：
+- crawl_car_stats 每个 (维度, 分桶) 一行 count / sum，接口只读这张小表，
+  耗时和 crawl_cars 有多少行无关
+- 新数据入库后 refresh_stats 只聚合水位线之后的 crawl_car_features，累加进去；
+  水位线是 import_seq（按提交顺序，见 import_seq.py），并发导入时先提交的大 id 不会让后提交的小 id 漏掉
+- 车龄会随时间变，所以按上牌年份分桶，查询时再换算成车龄
+- 价格直方图按 PRICE_BIN_WIDTH（1 万）存最细的桶，接口按需要的宽度合并
+"""
+import math
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.models.crawl_car_feature import CrawlCarFeature
+from app.models.crawl_car_stat import CrawlCarStat, CrawlCarStatWatermark
+from app.services.import_seq import current_import_seq
+
+STATS_CHUNK_SIZE = 5000
+PRICE_BIN_WIDTH = 1  # 万
+WATERMARK_NAME = "crawl_car_stats"
+
+DIM_BRAND = "brand"
+DIM_PRICE_BIN = "price_bin"
+DIM_PLATE_YEAR = "plate_year"
+DIM_GEARBOX = "gearbox"
+DIM_CITY = "city"
+
+SUM_FIELDS = [
+    "cnt",
+    "price_used_sum", "price_used_cnt",
+    "price_new_sum", "price_new_cnt",
+    "depreciation_sum", "depreciation_cnt",
+]
+
+_SOURCE_COLS = ["crawl_car_id", "brand", "plate_year", "gearbox", "city", "price_new", "price_used"]
+
+
+# ======================
+# 增量聚合
+# ======================
+def _aggregate(rows) -> dict[tuple[str, str], dict[str, float]]:
+    df = pd.DataFrame(list(rows), columns=_SOURCE_COLS)
+    pu = pd.to_numeric(df["price_used"], errors="coerce")
+    pn = pd.to_numeric(df["price_new"], errors="coerce")
+    valid_pn = pn.where(pn > 0)
+    work = pd.DataFrame({
+        "pu": pu,
+        "pn": pn,
+        "dep": (valid_pn - pu) / valid_pn,
+    })
+
+    keys = {
+        DIM_BRAND: df["brand"].fillna("未知").astype(str),
+        DIM_GEARBOX: df["gearbox"].fillna("未知").astype(str),
+        DIM_CITY: df["city"].fillna("未知").astype(str),
+        # 没有上牌年份 / 售价的行不进这两个维度（groupby 会丢掉 NaN 分组）
+        DIM_PLATE_YEAR: pd.to_numeric(df["plate_year"], errors="coerce").astype("Int64").astype("string"),
+        DIM_PRICE_BIN: (pu // PRICE_BIN_WIDTH * PRICE_BIN_WIDTH).astype("Int64").astype("string"),
+    }
+
+    out: dict[tuple[str, str], dict[str, float]] = {}
+    for dim, key in keys.items():
+        grouped = work.groupby(key, dropna=True).agg(
+            cnt=("pu", "size"),
+            price_used_sum=("pu", "sum"),
+            price_used_cnt=("pu", "count"),
+            price_new_sum=("pn", "sum"),
+            price_new_cnt=("pn", "count"),
+            depreciation_sum=("dep", "sum"),
+            depreciation_cnt=("dep", "count"),
+        )
+        for bucket, rec in grouped.iterrows():
+            out[(dim, str(bucket))] = {f: float(rec[f]) for f in SUM_FIELDS}
+    return out
+
+
+def _merge(db: Session, deltas: dict[tuple[str, str], dict[str, float]]) -> None:
+    # 统计表只有几千行（品牌 + 城市 + 价格桶 + 年份），整表读出来改完再 flush
+    existing = {(s.dimension, s.bucket): s for s in db.scalars(select(CrawlCarStat))}
+    for (dim, bucket), delta in deltas.items():
+        row = existing.get((dim, bucket))
+        if row is None:
+            row = CrawlCarStat(dimension=dim, bucket=bucket, **{f: 0 for f in SUM_FIELDS})
+            db.add(row)
+        for f in SUM_FIELDS:
+            value = getattr(row, f) + delta[f]
+            setattr(row, f, int(value) if f == "cnt" or f.endswith("_cnt") else value)
+
+
+def _lock_watermark(db: Session) -> CrawlCarStatWatermark:
+    # SELECT ... FOR UPDATE：多个进程同时刷新时排队，避免重复累加
+    wm = db.scalars(
+        select(CrawlCarStatWatermark)
+        .where(CrawlCarStatWatermark.name == WATERMARK_NAME)
+        .with_for_update()
+    ).first()
+    if wm is None:
+        wm = CrawlCarStatWatermark(name=WATERMARK_NAME, last_seq=0)
+        db.add(wm)
+        db.flush()
+    return wm
+
+
+def _refresh_locked(db: Session, wm: CrawlCarStatWatermark, chunk_size: int) -> int:
+    # 先记下上界，刷新过程中新提交的行留给下一次
+    max_seq = current_import_seq(db)
+    if max_seq <= wm.last_seq:
+        return 0
+
+    deltas: dict[tuple[str, str], dict[str, float]] = defaultdict(lambda: dict.fromkeys(SUM_FIELDS, 0.0))
+    after = wm.last_seq
+    total = 0
+    while True:
+        rows = db.execute(
+            select(CrawlCarFeature.import_seq, *[getattr(CrawlCarFeature, c) for c in _SOURCE_COLS])
+            .where(CrawlCarFeature.import_seq > after, CrawlCarFeature.import_seq <= max_seq)
+            .order_by(CrawlCarFeature.import_seq)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+        for key, delta in _aggregate(r[1:] for r in rows).items():
+            acc = deltas[key]
+            for f in SUM_FIELDS:
+                acc[f] += delta[f]
+        total += len(rows)
+        after = rows[-1].import_seq
+
+    _merge(db, deltas)
+    wm.last_seq = max_seq
+    wm.refreshed_at = datetime.now()
+    return total
+
+
+def refresh_stats(db: Session, chunk_size: int = STATS_CHUNK_SIZE) -> int:
+    """把水位线之后的新数据累加进统计表，返回新聚合的行数（导入完成后调用）"""
+    try:
+        wm = _lock_watermark(db)
+        total = _refresh_locked(db, wm, chunk_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return total
+
+
+def rebuild_stats(db: Session, chunk_size: int = STATS_CHUNK_SIZE) -> int:
+    """清空重算，统计口径改了的时候用"""
+    try:
+        wm = _lock_watermark(db)
+        db.execute(delete(CrawlCarStat))
+        wm.last_seq = 0
+        total = _refresh_locked(db, wm, chunk_size)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return total
+
+
+# ======================
+# 读取（只查 crawl_car_stats）
+# ======================
+def _avg(total: float, n: int) -> Optional[float]:
+    return round(total / n, 4) if n else None
+
+
+def _dimension_rows(db: Session, dim: str) -> list[CrawlCarStat]:
+    return list(db.scalars(select(CrawlCarStat).where(CrawlCarStat.dimension == dim)))
+
+
+def _share_list(rows: list[CrawlCarStat], key: str, limit: Optional[int] = None) -> list[dict]:
+    total = sum(r.cnt for r in rows)
+    rows = sorted(rows, key=lambda r: r.cnt, reverse=True)
+    if limit is not None:
+        rows = rows[:limit]
+    return [
+        {
+            key: r.bucket,
+            "count": r.cnt,
+            "share": round(r.cnt / total, 4) if total else 0.0,
+            "avg_price_used": _avg(r.price_used_sum, r.price_used_cnt),
+        }
+        for r in rows
+    ]
+
+
+def brand_counts(db: Session, limit: int = 20) -> list[dict]:
+    return _share_list(_dimension_rows(db, DIM_BRAND), "brand", limit)
+
+
+def gearbox_share(db: Session) -> list[dict]:
+    return _share_list(_dimension_rows(db, DIM_GEARBOX), "gearbox")
+
+
+def city_distribution(db: Session, limit: int = 20) -> list[dict]:
+    return _share_list(_dimension_rows(db, DIM_CITY), "city", limit)
+
+
+def price_histogram(db: Session, bin_width: int = PRICE_BIN_WIDTH) -> list[dict]:
+    # 存的是 1 万一档，按 bin_width 合并成更宽的桶
+    bins: dict[int, int] = defaultdict(int)
+    for r in _dimension_rows(db, DIM_PRICE_BIN):
+        lo = math.floor(int(r.bucket) / bin_width) * bin_width
+        bins[lo] += r.cnt
+    return [{"lo": lo, "hi": lo + bin_width, "count": bins[lo]} for lo in sorted(bins)]
+
+
+def depreciation_by_age(db: Session, now_year: Optional[int] = None) -> list[dict]:
+    now_year = now_year or datetime.now().year
+    out = []
+    for r in _dimension_rows(db, DIM_PLATE_YEAR):
+        year = int(r.bucket)
+        out.append({
+            "plate_year": year,
+            "age_years": max(now_year - year, 0),
+            "count": r.cnt,
+            "avg_price_used": _avg(r.price_used_sum, r.price_used_cnt),
+            "avg_price_new": _avg(r.price_new_sum, r.price_new_cnt),
+            "avg_depreciation_rate": _avg(r.depreciation_sum, r.depreciation_cnt),
+        })
+    out.sort(key=lambda d: d["age_years"])
+    return out
+
+
+def stats_overview(db: Session) -> dict:
+    wm = db.get(CrawlCarStatWatermark, WATERMARK_NAME)
+    # 每行车在每个维度正好计一次，任取一个没有丢值的维度求和就是总数
+    total = db.scalar(
+        select(func.coalesce(func.sum(CrawlCarStat.cnt), 0)).where(CrawlCarStat.dimension == DIM_BRAND)
+    )
+    return {
+        "total": int(total),
+        "last_seq": wm.last_seq if wm else 0,
+        "refreshed_at": wm.refreshed_at.isoformat() if wm and wm.refreshed_at else None,
+    }
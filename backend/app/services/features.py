@@ -0,0 +1,177 @@
+# app/services/features.py
+"""
+列式特征工程：一次处理一整列，而不是 build_row 那样一行一行跑正则。
+训练（app/train.py）和批量预测共用这里的列定义和解析逻辑。
+
+    "2.0T"     -> engine = 2.0
+    "1次"      -> transfer_cnt = 1
+    "2023年11月" -> age_years = 今年 - 2023
+    "传祺M8 2024款 ..." -> brand = "传祺M8"
+"""
+from datetime import datetime
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import pandas as pd
+
+NUM_COLS = ["age_years", "engine", "transfer_cnt", "price_new"]
+CAT_COLS = ["brand", "gearbox"]
+# 和 CarPredictIn 字段顺序一致
+FEATURE_COLUMNS = ["brand", "age_years", "engine", "gearbox", "transfer_cnt", "price_new"]
+TARGET_COL = "y"
+REQUIRED_COLS = ["age_years", "engine", "price_new", TARGET_COL]
+
+# CrawlCar.info 里用到的 key
+INFO_KEYS = {
+    "plate_time": "上牌时间",
+    "engine": "排量",
+    "gearbox": "变速箱",
+    "transfer": "过户次数",
+    "price_new": "新车指导价",
+    "price_used": "当前售价",
+    "city": "车源地",
+}
+
+# crawl_car_features 表里的类型化字段（见 build_feature_table）
+FEATURE_TABLE_COLUMNS = [
+    "brand", "plate_year", "engine", "gearbox", "transfer_cnt", "price_new", "price_used", "city",
+]
+
+
+def _info_column(infos: Sequence[Optional[dict]], key: str) -> pd.Series:
+    # 只取需要的几个 key，比 json_normalize 整个 dict 快得多
+    return pd.Series([d.get(key) if d else None for d in infos], dtype=object)
+
+
+def _on_uniques(col: pd.Series, fn: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    "2.0T" / "1次" / "2023年11月" 这类取值重复度极高：
+    先 factorize 去重，只对去重后的取值跑字符串解析，再按编码映射回整列。
+    """
+    codes, uniques = pd.factorize(col, use_na_sentinel=True)
+    parsed = fn(pd.Series(uniques, dtype=object))
+    # 末尾补一个 NaN，让缺失值的编码 -1 正好取到它
+    parsed = pd.concat([parsed, pd.Series([None], dtype=parsed.dtype)], ignore_index=True)
+    return pd.Series(parsed.to_numpy()[codes], index=col.index)
+
+
+def _extract_number(col: pd.Series, pattern: str) -> pd.Series:
+    s = col.astype("string").str.extract(pattern, expand=False)
+    return pd.to_numeric(s, errors="coerce").astype("float64")
+
+
+def parse_brand(titles: pd.Series) -> pd.Series:
+    brand = _on_uniques(titles, lambda u: u.astype("string").str.split(n=1).str[0].astype(object))
+    return brand.where(brand.notna(), "未知")
+
+
+def parse_engine(col: pd.Series) -> pd.Series:
+    return _on_uniques(col, lambda u: _extract_number(u, r"([\d.]+)"))
+
+
+def parse_transfer_count(col: pd.Series) -> pd.Series:
+    # 空值 / 解析不出数字都算 0 次
+    s = _on_uniques(col, lambda u: _extract_number(u, r"(\d+)"))
+    return s.fillna(0).astype("int64")
+
+
+def parse_plate_year(col: pd.Series) -> pd.Series:
+    return _on_uniques(col, lambda u: _extract_number(u, r"(\d{4})年"))
+
+
+def age_from_plate_year(year: pd.Series, now_year: Optional[int] = None) -> pd.Series:
+    now_year = now_year or datetime.now().year
+    return (now_year - year.astype("float64")).clip(lower=0)
+
+
+def parse_age_years(col: pd.Series, now_year: Optional[int] = None) -> pd.Series:
+    return age_from_plate_year(parse_plate_year(col), now_year)
+
+
+def build_features(
+    titles: Iterable[Optional[str]],
+    infos: Sequence[Optional[dict]],
+    now_year: Optional[int] = None,
+    dropna: bool = True,
+) -> pd.DataFrame:
+    """
+    titles / infos 是同样长度的两列（CrawlCar.title / CrawlCar.info），
+    返回 FEATURE_COLUMNS + y；dropna=True 时去掉缺关键字段的行（和训练时的过滤一致）。
+    """
+    titles = pd.Series(list(titles), dtype=object)
+    infos = list(infos)
+
+    gearbox = _info_column(infos, INFO_KEYS["gearbox"])
+    df = pd.DataFrame({
+        "brand": parse_brand(titles),
+        "age_years": parse_age_years(_info_column(infos, INFO_KEYS["plate_time"]), now_year),
+        "engine": parse_engine(_info_column(infos, INFO_KEYS["engine"])),
+        "gearbox": gearbox.where(gearbox.notna(), "未知"),
+        "transfer_cnt": parse_transfer_count(_info_column(infos, INFO_KEYS["transfer"])),
+        "price_new": pd.to_numeric(_info_column(infos, INFO_KEYS["price_new"]), errors="coerce"),
+        TARGET_COL: pd.to_numeric(_info_column(infos, INFO_KEYS["price_used"]), errors="coerce"),
+    })
+
+    if dropna:
+        df = df.dropna(subset=REQUIRED_COLS).reset_index(drop=True)
+    return df
+
+
+def build_feature_table(titles: Iterable[Optional[str]], infos: Sequence[Optional[dict]]) -> pd.DataFrame:
+    """
+    落库（crawl_car_features）用的类型化字段：
+    - 存上牌年份而不是车龄，车龄随时间变，查询 / 训练时再算
+    - 不过滤缺失值，缺的字段就是 NULL
+    """
+    titles = pd.Series(list(titles), dtype=object)
+    infos = list(infos)
+
+    gearbox = _info_column(infos, INFO_KEYS["gearbox"])
+    city = _info_column(infos, INFO_KEYS["city"])
+    df = pd.DataFrame({
+        "brand": parse_brand(titles),
+        "plate_year": parse_plate_year(_info_column(infos, INFO_KEYS["plate_time"])),
+        "engine": parse_engine(_info_column(infos, INFO_KEYS["engine"])),
+        "gearbox": gearbox.where(gearbox.notna(), "未知"),
+        "transfer_cnt": parse_transfer_count(_info_column(infos, INFO_KEYS["transfer"])),
+        "price_new": pd.to_numeric(_info_column(infos, INFO_KEYS["price_new"]), errors="coerce"),
+        "price_used": pd.to_numeric(_info_column(infos, INFO_KEYS["price_used"]), errors="coerce"),
+        "city": city.where(city.notna(), None),
+    })
+    return df[FEATURE_TABLE_COLUMNS]
+
+
+def feature_records(titles: Iterable[Optional[str]], infos: Sequence[Optional[dict]]) -> list[dict]:
+    # NaN -> None，直接能拿去 insert
+    df = build_feature_table(titles, infos).astype(object)
+    df = df.where(df.notna(), None)
+    records = df.to_dict(orient="records")
+    for r in records:
+        if r["plate_year"] is not None:
+            r["plate_year"] = int(r["plate_year"])
+    return records
+
+
+def build_features_from_rows(rows: Iterable[Any], now_year: Optional[int] = None, dropna: bool = True) -> pd.DataFrame:
+    # rows 里每个元素有 .title / .info（ORM 对象或 select 出来的 Row）
+    rows = list(rows)
+    return build_features([r.title for r in rows], [r.info for r in rows], now_year, dropna)
+
+
+def build_features_from_table_rows(rows: Iterable[Any], now_year: Optional[int] = None, dropna: bool = True) -> pd.DataFrame:
+    """
+    从 crawl_car_features 的类型化列直接组装训练特征，不再解析 JSON。
+    rows 需要有 brand / plate_year / engine / gearbox / transfer_cnt / price_new / price_used。
+    """
+    t = pd.DataFrame(list(rows), columns=FEATURE_TABLE_COLUMNS)
+    df = pd.DataFrame({
+        "brand": t["brand"].where(t["brand"].notna(), "未知").astype(object),
+        "age_years": age_from_plate_year(pd.to_numeric(t["plate_year"], errors="coerce"), now_year),
+        "engine": pd.to_numeric(t["engine"], errors="coerce"),
+        "gearbox": t["gearbox"].where(t["gearbox"].notna(), "未知").astype(object),
+        "transfer_cnt": pd.to_numeric(t["transfer_cnt"], errors="coerce").fillna(0).astype("int64"),
+        "price_new": pd.to_numeric(t["price_new"], errors="coerce"),
+        TARGET_COL: pd.to_numeric(t["price_used"], errors="coerce"),
+    })
+    if dropna:
+        df = df.dropna(subset=REQUIRED_COLS).reset_index(drop=True)
+    return df
@@ -0,0 +1,36 @@
+# app/services/import_seq.py
+"""
+crawl_car_features.import_seq：按提交顺序给特征行编号，看板统计（crawl_stats.py）和增量训练（train.py）
+都拿它当水位线，不再用 MAX(crawl_car_id)：
+- 自增 id 在 INSERT 时就分配了，两个导入交叉时，id 小的一批可能在水位线越过它之后才提交，
+  按 id 取增量会永远漏掉这批（和 cars.sync_seq 一样的问题，见 annotation_sync.py）
+- 写 crawl_car_features 的事务（导入 / 回填）先 SELECT ... FOR UPDATE 锁住 car_sync_counters 里
+  name=crawl_car_features 那一行，锁持有到提交；序号大的事务一定在序号小的提交之后才分配，
+  已提交的序号总是一段连续前缀，读的时候取 MAX(import_seq) 就是安全的上界
+- 代价：同时跑的几个导入在“分配序号 -> 提交”之间串行（每 COMMIT_EVERY 行一段），解析照样并行
+"""
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.car import CarSyncCounter
+from app.models.crawl_car_feature import CrawlCarFeature
+from app.services.annotation_sync import allocate_sync_seq, lock_sync_counter
+
+IMPORT_COUNTER_NAME = "crawl_car_features"
+
+
+def lock_import_counter(db: Session) -> CarSyncCounter:
+    return lock_sync_counter(db, IMPORT_COUNTER_NAME, CrawlCarFeature.import_seq)
+
+
+def stamp_import_seq(db: Session, records: list[dict]) -> None:
+    """给这批 crawl_car_features 行分配连续的序号（调用方的事务里，提交前一直锁着计数器）"""
+    if not records:
+        return
+    first = allocate_sync_seq(lock_import_counter(db), len(records))
+    for i, rec in enumerate(records):
+        rec["import_seq"] = first + i
+
+
+def current_import_seq(db: Session) -> int:
+    return db.scalar(select(func.max(CrawlCarFeature.import_seq))) or 0
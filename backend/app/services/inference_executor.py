@@ -0,0 +1,127 @@
+# app/services/inference_executor.py
+"""
+sklearn predict 放在哪里跑（PREDICT_EXECUTOR）：
+- inline ：在请求线程里直接算（默认，和以前一样）
+- thread ：固定大小线程池；LinearRegression 这类 numpy 重活会释放 GIL
+- process：进程池，每个子进程启动时各自加载一份模型，
+           GBDT / 随机森林这种吃 GIL 的模型不会再和 uvicorn 抢 CPU
+排队请求超过 PREDICT_QUEUE_SIZE 时直接拒绝（路由里转成 503），避免越堆越慢。
+"""
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+import pandas as pd
+
+from app.services.features import FEATURE_COLUMNS
+from app.services.model_registry import LoadedModel, ModelRegistry
+
+PREDICT_EXECUTOR = os.getenv("PREDICT_EXECUTOR", "inline")  # inline / thread / process
+PREDICT_WORKERS = int(os.getenv("PREDICT_WORKERS", str(os.cpu_count() or 1)))
+PREDICT_QUEUE_SIZE = int(os.getenv("PREDICT_QUEUE_SIZE", "256"))
+
+
+class InferenceQueueFull(RuntimeError):
+    """推理排队已满"""
+
+
+# ======================
+# 子进程里的模型（每个 worker 进程一份）
+# ======================
+_worker_registry: Optional[ModelRegistry] = None
+
+
+def _init_worker(model_path: Optional[str]) -> None:
+    # 默认和主进程一样读模型仓库；模型是 mmap 加载的，各子进程共享同一份物理页
+    global _worker_registry
+    _worker_registry = ModelRegistry() if model_path is None else ModelRegistry(model_path, store=None)
+    _worker_registry.reload(force=True)
+
+
+def _predict_in_worker(rows: list[dict]) -> tuple[str, list[float]]:
+    # 子进程同样按 mtime 检查热更新，返回实际用到的模型版本
+    loaded = _worker_registry.get()
+    X = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    return loaded.version, [float(y) for y in loaded.model.predict(X)]
+
+
+def _predict_local(loaded: LoadedModel, rows: list[dict]) -> tuple[str, list[float]]:
+    X = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+    return loaded.version, [float(y) for y in loaded.model.predict(X)]
+
+
+class InferenceExecutor:
+    def __init__(
+        self,
+        mode: str = PREDICT_EXECUTOR,
+        workers: int = PREDICT_WORKERS,
+        queue_size: int = PREDICT_QUEUE_SIZE,
+        # 指定单文件模型（压测用）；None 表示走模型仓库
+        model_path: Optional[str] = None,
+    ):
+        if mode not in ("inline", "thread", "process"):
+            raise ValueError(f"未知的 PREDICT_EXECUTOR: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.queue_size = queue_size
+        self.model_path = model_path
+        self._pool: Optional[Executor] = None
+        self.in_flight = 0
+        self.rejected = 0
+
+    def _get_pool(self) -> Optional[Executor]:
+        if self.mode == "inline" or self._pool is not None:
+            return self._pool
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="predict")
+        else:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_path,),
+            )
+        return self._pool
+
+    def start(self) -> None:
+        """提前拉起线程 / 进程池（进程模式下顺便让每个子进程把模型加载好）"""
+        pool = self._get_pool()
+        if isinstance(pool, ProcessPoolExecutor):
+            futures = [pool.submit(os.getpid) for _ in range(self.workers)]
+            for f in futures:
+                f.result()
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def run(self, loaded: LoadedModel, rows: list[dict]) -> tuple[str, list[float]]:
+        """返回 (实际使用的模型版本, 预测值列表)"""
+        if self.in_flight >= self.workers + self.queue_size:
+            self.rejected += 1
+            raise InferenceQueueFull(f"推理队列已满（{self.in_flight} 个请求在排队/计算）")
+
+        self.in_flight += 1
+        try:
+            pool = self._get_pool()
+            if pool is None:
+                return _predict_local(loaded, rows)
+            loop = asyncio.get_running_loop()
+            if self.mode == "thread":
+                return await loop.run_in_executor(pool, _predict_local, loaded, rows)
+            return await loop.run_in_executor(pool, _predict_in_worker, rows)
+        finally:
+            self.in_flight -= 1
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers if self.mode != "inline" else 0,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "rejected": self.rejected,
+        }
+
+
+inference_executor = InferenceExecutor() if PREDICT_EXECUTOR != "inline" else None
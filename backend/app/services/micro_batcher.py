@@ -0,0 +1,136 @@
+# app/services/micro_batcher.py
+"""
+/predict 微批调度（可选，PREDICT_MICROBATCH=1 打开）：
+- 并发进来的单条请求先排队
+- 攒够 max_batch 条，或第一条等了 max_wait_ms 毫秒，就拼成一个 DataFrame 调一次 predict
+- 每个请求拿回自己那一行的结果（asyncio.Future）
+并发越高，每批越大，sklearn 的固定开销被摊得越薄。
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+from typing import Optional
+
+import pandas as pd
+from fastapi.concurrency import run_in_threadpool
+
+from app.services.features import FEATURE_COLUMNS
+from app.services.inference_executor import inference_executor
+from app.services.model_registry import LoadedModel
+
+PREDICT_MICROBATCH = os.getenv("PREDICT_MICROBATCH", "0") == "1"
+PREDICT_MICROBATCH_MAX_SIZE = int(os.getenv("PREDICT_MICROBATCH_MAX_SIZE", "64"))
+PREDICT_MICROBATCH_MAX_WAIT_MS = float(os.getenv("PREDICT_MICROBATCH_MAX_WAIT_MS", "2"))
+
+
+def _bucket(n: int) -> str:
+    # 批大小分布按 2 的幂分桶：1 / 2 / 3-4 / 5-8 / ...
+    upper = 1
+    while upper < n:
+        upper *= 2
+    lower = upper // 2 + 1 if upper > 1 else 1
+    return str(upper) if lower == upper else f"{lower}-{upper}"
+
+
+class MicroBatcher:
+    def __init__(self, max_batch: int = PREDICT_MICROBATCH_MAX_SIZE, max_wait_ms: float = PREDICT_MICROBATCH_MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+        self.batches = 0
+        self.rows = 0
+        self.max_seen = 0
+        self.size_hist: Counter[str] = Counter()
+
+    def _ensure_started(self) -> asyncio.Queue:
+        # 懒启动：第一次有请求时才在当前事件循环里起后台任务
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def submit(self, loaded: LoadedModel, row: dict) -> tuple[str, float]:
+        """返回 (实际使用的模型版本, 预测值)"""
+        queue = self._ensure_started()
+        fut = asyncio.get_running_loop().create_future()
+        await queue.put((loaded, row, fut))
+        return await fut
+
+    async def _collect(self) -> list[tuple]:
+        queue = self._queue
+        first = await queue.get()
+        items = [first]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(items) < self.max_batch:
+            # 先把已经在队列里的一口气拿完
+            try:
+                items.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _run(self) -> None:
+        while True:
+            items = await self._collect()
+
+            # 热更新瞬间一批里可能混着两个版本的模型，按模型分组各算各的
+            groups: dict[int, list[tuple]] = {}
+            for item in items:
+                groups.setdefault(id(item[0]), []).append(item)
+
+            for group in groups.values():
+                await self._flush(group)
+
+            n = len(items)
+            self.batches += 1
+            self.rows += n
+            self.max_seen = max(self.max_seen, n)
+            self.size_hist[_bucket(n)] += 1
+
+    async def _flush(self, group: list[tuple]) -> None:
+        loaded = group[0][0]
+        rows = [row for _, row, _ in group]
+        try:
+            if inference_executor is not None:
+                version, preds = await inference_executor.run(loaded, rows)
+            else:
+                X = pd.DataFrame(rows, columns=FEATURE_COLUMNS)
+                version, preds = loaded.version, await run_in_threadpool(loaded.model.predict, X)
+        except Exception as e:
+            for _, _, fut in group:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        for (_, _, fut), y in zip(group, preds):
+            # 调用方可能已经断开（被取消），跳过即可
+            if not fut.done():
+                fut.set_result((version, float(y)))
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "rows": self.rows,
+            "avg_batch_size": round(self.rows / self.batches, 2) if self.batches else 0,
+            "max_batch_size": self.max_seen,
+            "batch_size_hist": dict(self.size_hist),
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+
+micro_batcher = MicroBatcher() if PREDICT_MICROBATCH else None
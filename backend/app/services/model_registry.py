@@ -0,0 +1,155 @@
+# app/services/model_registry.py
+"""
+进程内模型注册表：
+- 每个 uvicorn worker 启动时加载一次模型，所有请求共享
+- 优先读版本化模型仓库（models/CURRENT，见 model_store.py），
+  没有仓库时退回旧的单文件 car_price_model.pkl
+- 定期检查 CURRENT / 模型文件的 mtime，有新模型发布时原子替换
+- 有打分表（scoring.json）时启动只读 JSON，Pipeline 第一次真正要用时才 mmap 加载
+- 每次预测都能拿到“是哪个版本的模型算出来的”
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import cached_property
+from typing import Any, Callable, Optional
+
+import joblib
+
+from app.services.compiled_model import ScoringTable, try_compile
+from app.services.model_store import ModelStore, model_store
+from app.train import MODEL_PATH
+
+# 两次 mtime 检查之间的最小间隔（秒），避免每个请求都 stat 一次
+MODEL_CHECK_INTERVAL = float(os.getenv("MODEL_CHECK_INTERVAL", "5"))
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    version: str
+    path: str
+    mtime: float
+    loaded_at: datetime
+    # 线性模型编译出来的打分表；模型结构不支持时为 None
+    scoring: Optional[ScoringTable] = None
+    # 真正加载 sklearn Pipeline 的函数，第一次访问 .model 时才调用
+    loader: Callable[[], Any] = field(default=lambda: None, repr=False, compare=False)
+
+    @cached_property
+    def model(self) -> Any:
+        return self.loader()
+
+
+def _version_from_mtime(mtime: float) -> str:
+    # 用文件修改时间当版本号：20260105093419
+    return datetime.fromtimestamp(mtime).strftime("%Y%m%d%H%M%S")
+
+
+class ModelRegistry:
+    def __init__(
+        self,
+        path: str = MODEL_PATH,
+        check_interval: float = MODEL_CHECK_INTERVAL,
+        store: Optional[ModelStore] = model_store,
+    ):
+        # path 是旧的单文件模型；store 为 None 时只看 path
+        self.path = path
+        self.store = store
+        self.check_interval = check_interval
+        self._current: Optional[LoadedModel] = None
+        self._lock = threading.Lock()
+        self._last_check = 0.0
+        # 模型切换后的回调（比如清空预测缓存）
+        self._listeners: list[Callable[[LoadedModel], None]] = []
+
+    def add_listener(self, fn: Callable[[LoadedModel], None]) -> None:
+        self._listeners.append(fn)
+
+    def _use_store(self) -> bool:
+        return self.store is not None and self.store.current_version() is not None
+
+    def _source_mtime(self) -> float:
+        # 发布新版本 = 替换 CURRENT，所以只需要 stat 这一个文件
+        if self._use_store():
+            return os.path.getmtime(self.store.current_pointer)
+        return os.path.getmtime(self.path)
+
+    def _load(self) -> LoadedModel:
+        if not self._use_store():
+            mtime = os.path.getmtime(self.path)
+            model = joblib.load(self.path)
+            return LoadedModel(
+                version=_version_from_mtime(mtime),
+                path=self.path,
+                mtime=mtime,
+                loaded_at=datetime.now(),
+                scoring=try_compile(model),
+                loader=lambda: model,
+            )
+
+        store = self.store
+        mtime = os.path.getmtime(store.current_pointer)
+        version = store.current_version()
+        scoring = store.load_scoring(version)
+        loaded = LoadedModel(
+            version=version,
+            path=str(store.version_dir(version)),
+            mtime=mtime,
+            loaded_at=datetime.now(),
+            scoring=scoring,
+            loader=lambda: store.load_model(version),
+        )
+        if scoring is None:
+            # 非线性模型每个请求都要走 sklearn，启动时就加载好（mmap，不占私有内存）
+            loaded.model
+        return loaded
+
+    def reload(self, force: bool = False) -> LoadedModel:
+        """重新加载模型；force=False 时只有文件变了才真正加载"""
+        with self._lock:
+            current = self._current
+            if not force and current is not None:
+                if self._source_mtime() == current.mtime:
+                    self._last_check = time.monotonic()
+                    return current
+
+            # 先在锁内加载好新模型，再一次性替换引用（读者不会看到半成品）
+            loaded = self._load()
+            self._current = loaded
+            self._last_check = time.monotonic()
+
+        for fn in self._listeners:
+            fn(loaded)
+        return loaded
+
+    def get(self) -> LoadedModel:
+        current = self._current
+        if current is None:
+            return self.reload(force=True)
+
+        if time.monotonic() - self._last_check >= self.check_interval:
+            try:
+                return self.reload()
+            except (OSError, EOFError):
+                # 新模型正在写入 / 被删掉：继续用旧模型
+                self._last_check = time.monotonic()
+        return current
+
+    def info(self) -> dict:
+        current = self._current
+        if current is None:
+            return {"loaded": False, "path": self.path, "store": str(self.store.root) if self.store else None}
+        return {
+            "loaded": True,
+            "path": current.path,
+            "model_version": current.version,
+            "loaded_at": current.loaded_at.isoformat(),
+            "compiled": current.scoring is not None,
+            # 有打分表时 Pipeline 可能还没加载过
+            "pipeline_loaded": "model" in current.__dict__,
+        }
+
+
+registry = ModelRegistry()
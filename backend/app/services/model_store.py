@@ -0,0 +1,161 @@
+# app/services/model_store.py
+"""
+版本化的模型仓库（MODEL_STORE_DIR，默认 ./models）：
+
+    models/
+      CURRENT                      <- 当前线上版本号（原子替换）
+      20261017-220501-123456/
+        model.joblib               <- 不压缩的 joblib，numpy 数组可以 mmap_mode="r" 直接映射
+        scoring.json               <- 线性模型的打分表（有它就不用在启动时反序列化 Pipeline）
+        metadata.json              <- 训练行数 / 特征 schema / 指标 / git sha ...
+
+- 发布：先写到临时目录，rename 成版本目录，最后替换 CURRENT，读的一方永远看不到半成品
+- 加载：joblib.load(mmap_mode="r")，多个 uvicorn worker 共享同一份只读页（page cache），
+  不再各自持有一份私有拷贝
+"""
+import json
+import os
+import shutil
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+import joblib
+
+from app.services.compiled_model import ScoringTable
+
+MODEL_STORE_DIR = os.getenv("MODEL_STORE_DIR", "models")
+# 保留最近几个版本（方便回滚），更老的在发布新版本时清掉
+MODEL_STORE_KEEP = int(os.getenv("MODEL_STORE_KEEP", "5"))
+
+CURRENT_FILE = "CURRENT"
+MODEL_FILE = "model.joblib"
+SCORING_FILE = "scoring.json"
+METADATA_FILE = "metadata.json"
+
+
+def _git_sha() -> Optional[str]:
+    sha = os.getenv("GIT_SHA")
+    if sha:
+        return sha
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            timeout=5,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def _write_json(path: Path, data: Any) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class ModelStore:
+    def __init__(self, root: str = MODEL_STORE_DIR):
+        self.root = Path(root)
+
+    @property
+    def current_pointer(self) -> Path:
+        return self.root / CURRENT_FILE
+
+    def version_dir(self, version: str) -> Path:
+        return self.root / version
+
+    def current_version(self) -> Optional[str]:
+        try:
+            version = self.current_pointer.read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+        return version or None
+
+    def list_versions(self) -> list[str]:
+        if not self.root.exists():
+            return []
+        return sorted(
+            p.name for p in self.root.iterdir()
+            if p.is_dir() and not p.name.startswith(".") and (p / METADATA_FILE).exists()
+        )
+
+    # ======================
+    # 发布
+    # ======================
+    def publish(
+        self,
+        model,
+        metadata: dict,
+        scoring: Optional[ScoringTable] = None,
+        activate: bool = True,
+    ) -> str:
+        # 精确到微秒，按字符串排序就是发布顺序（prune 依赖这一点）
+        version = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = self.root / f".tmp-{version}"
+        tmp_dir.mkdir()
+
+        try:
+            # 不压缩：压缩过的数组没法 mmap
+            joblib.dump(model, tmp_dir / MODEL_FILE)
+            if scoring is not None:
+                _write_json(tmp_dir / SCORING_FILE, scoring.to_dict())
+            _write_json(tmp_dir / METADATA_FILE, {
+                "version": version,
+                "created_at": datetime.now().isoformat(),
+                "git_sha": _git_sha(),
+                "model_class": type(getattr(model, "named_steps", {}).get("reg", model)).__name__,
+                "compiled": scoring is not None,
+                **metadata,
+            })
+            os.rename(tmp_dir, self.version_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version: str) -> None:
+        """把 CURRENT 指到某个版本（也用来回滚）"""
+        if not (self.version_dir(version) / METADATA_FILE).exists():
+            raise FileNotFoundError(f"模型版本不存在: {version}")
+        tmp = self.root / f".{CURRENT_FILE}.tmp"
+        tmp.write_text(version, encoding="utf-8")
+        os.replace(tmp, self.current_pointer)
+        self.prune()
+
+    def prune(self, keep: int = MODEL_STORE_KEEP) -> None:
+        current = self.current_version()
+        versions = self.list_versions()
+        # 版本号按时间排序，旧的在前；当前版本永远保留
+        for v in versions[:-keep] if keep > 0 else []:
+            if v != current:
+                # 已经 mmap 了旧文件的进程不受影响（Linux 下 unlink 不影响已映射的页）
+                shutil.rmtree(self.version_dir(v), ignore_errors=True)
+
+    # ======================
+    # 读取
+    # ======================
+    def load_model(self, version: str, mmap: bool = True):
+        return joblib.load(self.version_dir(version) / MODEL_FILE, mmap_mode="r" if mmap else None)
+
+    def load_scoring(self, version: str) -> Optional[ScoringTable]:
+        path = self.version_dir(version) / SCORING_FILE
+        try:
+            with open(path, encoding="utf-8") as f:
+                return ScoringTable.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+
+    def metadata(self, version: str) -> dict:
+        with open(self.version_dir(version) / METADATA_FILE, encoding="utf-8") as f:
+            return json.load(f)
+
+
+model_store = ModelStore()
@@ -0,0 +1,153 @@
+# app/services/predict_cache.py
+"""
+预测结果缓存：
+- key = 规范化后的 CarPredictIn（浮点取整、品牌/变速箱去多余空格）+ 模型版本
+- 预测本身也用规范化后的输入，保证同一个 key 对应的结果唯一
+- 默认进程内 LRU + TTL；配置 PREDICT_CACHE_BACKEND=redis 时多个 worker 共享
+- 模型热更新后版本号变了，旧 key 自然失效；进程内缓存顺便整表清空
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import redis
+
+from app.schemas.predict import CarPredictIn
+
+PREDICT_CACHE_BACKEND = os.getenv("PREDICT_CACHE_BACKEND", "memory")  # memory / redis / off
+PREDICT_CACHE_SIZE = int(os.getenv("PREDICT_CACHE_SIZE", "10000"))
+PREDICT_CACHE_TTL = int(os.getenv("PREDICT_CACHE_TTL", "3600"))  # 秒
+
+# 浮点特征保留两位小数：0.01 万 / 0.01 年以下的差别对价格没有意义
+FLOAT_ROUND_DIGITS = 2
+
+
+def normalize_input(data: CarPredictIn) -> dict:
+    # 不改大小写：OneHotEncoder 的类别是区分大小写的
+    return {
+        "brand": " ".join(data.brand.split()),
+        "age_years": round(data.age_years, FLOAT_ROUND_DIGITS),
+        "engine": round(data.engine, FLOAT_ROUND_DIGITS),
+        "gearbox": data.gearbox.strip(),
+        "transfer_cnt": data.transfer_cnt,
+        "price_new": round(data.price_new, FLOAT_ROUND_DIGITS),
+    }
+
+
+def make_key(row: dict, model_version: str) -> str:
+    payload = json.dumps(row, ensure_ascii=False, sort_keys=True)
+    digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+    return f"predict:{model_version}:{digest}"
+
+
+class MemoryPredictCache:
+    def __init__(self, maxsize: int = PREDICT_CACHE_SIZE, ttl: int = PREDICT_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[float]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class RedisPredictCache:
+    """多个 uvicorn worker 共享；淘汰交给 Redis 的 TTL / maxmemory 策略"""
+
+    def __init__(self, ttl: int = PREDICT_CACHE_TTL):
+        # 复用邮箱验证码那边的 Redis 连接
+        from app.utils.email_store import r
+
+        self.r = r
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[float]:
+        try:
+            stored = self.r.get(key)
+        except redis.RedisError:
+            # Redis 挂了就当没命中，不影响预测
+            self.errors += 1
+            stored = None
+        if stored is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return float(stored)
+
+    def set(self, key: str, value: float) -> None:
+        try:
+            self.r.setex(key, self.ttl, value)
+        except redis.RedisError:
+            self.errors += 1
+
+    def clear(self) -> None:
+        # key 里带模型版本，旧版本的 key 等 TTL 过期即可，不需要 SCAN 删除
+        pass
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "ttl": self.ttl,
+            # 命中计数是当前 worker 的
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": None,
+            "errors": self.errors,
+        }
+
+
+def _build_cache():
+    if PREDICT_CACHE_BACKEND == "redis":
+        return RedisPredictCache()
+    if PREDICT_CACHE_BACKEND == "memory":
+        return MemoryPredictCache()
+    return None
+
+
+predict_cache = _build_cache()
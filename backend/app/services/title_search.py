@@ -0,0 +1,159 @@
+# app/services/title_search.py
+"""
+/crawl-cars/search 的标题全文检索：
+- MySQL：FULLTEXT(title) WITH PARSER ngram（ngram_token_size 默认 2），
+  MATCH ... AGAINST 自然语言模式打分，中文不用分词也能搜 “传祺M8 2024款”
+- 其他方言（本地 SQLite）：进程内倒排索引，同样按二元组（bigram）切词，
+  每个词按 idf 加权求和打分，用 numpy bincount 一次算完所有候选，百万行也是毫秒级
+- 两边都按 (score DESC, id DESC) 排序，游标是上一页最后一行的 (score, id)
+"""
+import base64
+import json
+import math
+import threading
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app import models
+
+SEARCH_SYNC_CHUNK = 10000
+# 本地索引的分数保留的小数位：翻页时用它比较，避免浮点求和顺序带来的误差
+SCORE_DIGITS = 6
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """和 MySQL ngram parser 一致：按空白切开，每段取相邻两个字符；单字符的段保留原样"""
+    grams = []
+    for part in (text or "").lower().split():
+        if len(part) == 1:
+            grams.append(part)
+        grams.extend(part[i:i + 2] for i in range(len(part) - 1))
+    return grams
+
+
+def encode_search_cursor(score: float, car_id: int) -> str:
+    raw = json.dumps({"s": score, "id": car_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        return float(data["s"]), int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="cursor 无效")
+
+
+# ======================
+# 进程内倒排索引（非 MySQL）
+# ======================
+class TitleSearchIndex:
+    def __init__(self):
+        self._car_ids: list[int] = []                  # 稠密下标 -> crawl_cars.id（递增）
+        self._postings: dict[str, list[int]] = {}      # bigram -> 稠密下标列表
+        self._arrays: dict[str, np.ndarray] = {}       # postings 的 numpy 版本，按需生成
+        self._car_id_array: Optional[np.ndarray] = None
+        self._max_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._car_ids)
+
+    def sync(self, db: Session, chunk_size: int = SEARCH_SYNC_CHUNK) -> int:
+        """把 id 比已索引的最大 id 大的新行加进来（标题基本不会改，只追加）"""
+        added = 0
+        with self._lock:
+            while True:
+                rows = db.execute(
+                    select(models.CrawlCar.id, models.CrawlCar.title)
+                    .where(models.CrawlCar.id > self._max_id)
+                    .order_by(models.CrawlCar.id)
+                    .limit(chunk_size)
+                ).all()
+                if not rows:
+                    return added
+                for car_id, title in rows:
+                    self._add(car_id, title)
+                added += len(rows)
+
+    def _add(self, car_id: int, title: Optional[str]) -> None:
+        doc = len(self._car_ids)
+        self._car_ids.append(car_id)
+        self._car_id_array = None
+        self._max_id = car_id
+        for gram in set(tokenize(title)):
+            self._postings.setdefault(gram, []).append(doc)
+            self._arrays.pop(gram, None)
+
+    def _array(self, gram: str) -> np.ndarray:
+        arr = self._arrays.get(gram)
+        if arr is None:
+            arr = self._arrays[gram] = np.asarray(self._postings[gram], dtype=np.int64)
+        return arr
+
+    def search(self, q: str, limit: int, cursor: Optional[tuple[float, int]] = None) -> list[tuple[int, float]]:
+        """返回 [(crawl_cars.id, score)]，按 score DESC, id DESC"""
+        with self._lock:
+            n = len(self._car_ids)
+            grams = [g for g in dict.fromkeys(tokenize(q)) if g in self._postings]
+            if not n or not grams:
+                return []
+
+            docs = np.concatenate([self._array(g) for g in grams])
+            weights = np.concatenate([
+                np.full(len(self._postings[g]), math.log(1 + n / len(self._postings[g]))) for g in grams
+            ])
+            scores = np.round(np.bincount(docs, weights=weights, minlength=n), SCORE_DIGITS)
+            cand = np.flatnonzero(scores)
+            if self._car_id_array is None:
+                self._car_id_array = np.asarray(self._car_ids, dtype=np.int64)
+            car_ids = self._car_id_array[cand]
+            cand_scores = scores[cand]
+
+        if cursor is not None:
+            s, last_id = cursor
+            keep = (cand_scores < s) | ((cand_scores == s) & (car_ids < last_id))
+            car_ids, cand_scores = car_ids[keep], cand_scores[keep]
+
+        # 只对可能进前 limit 名的候选做完整排序（常见词命中几十万行时全排太慢）
+        if len(cand_scores) > limit:
+            kth = np.partition(cand_scores, len(cand_scores) - limit)[len(cand_scores) - limit]
+            top = cand_scores >= kth
+            car_ids, cand_scores = car_ids[top], cand_scores[top]
+        order = np.lexsort((-car_ids, -cand_scores))[:limit]
+        return [(int(car_ids[i]), float(cand_scores[i])) for i in order]
+
+
+title_search_index = TitleSearchIndex()
+
+
+# ======================
+# 对外入口
+# ======================
+def search_titles(
+    db: Session,
+    q: str,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> list[tuple[int, float]]:
+    """返回最多 limit 条 (crawl_cars.id, score)，按相关度排序"""
+    after = decode_search_cursor(cursor) if cursor else None
+
+    if db.get_bind().dialect.name != "mysql":
+        title_search_index.sync(db)
+        return title_search_index.search(q, limit, after)
+
+    CrawlCar = models.CrawlCar
+    score = match(CrawlCar.title, against=q).in_natural_language_mode()
+    stmt = select(CrawlCar.id, score.label("score")).where(score > 0)
+    if after is not None:
+        s, last_id = after
+        stmt = stmt.where(or_(score < s, and_(score == s, CrawlCar.id < last_id)))
+    rows = db.execute(stmt.order_by(score.desc(), CrawlCar.id.desc()).limit(limit)).all()
+    # 不取整：游标里要原样带回 MySQL 算出来的分数，比较才精确
+    return [(r.id, float(r.score)) for r in rows]
@@ -0,0 +1,223 @@
+# app/services/train_jobs.py
+"""
+后台训练任务（POST /train）：
+- 每个任务一个 JSON 状态文件（TRAIN_JOB_DIR/<job_id>.json），
+  多个 uvicorn worker 都能查到同一个任务的进度
+- 训练跑在独立的子进程里（spawn，每个任务一个新进程），不占 uvicorn 的 CPU / 内存
+- 子进程之间用文件锁串行，多个 worker 同时提交也只会一个一个训
+- 训练成功后模型已经发布到模型仓库（CURRENT 指针），本进程立即 reload，
+  其他 worker 在 MODEL_CHECK_INTERVAL 内自己发现，不需要重启 uvicorn
+"""
+import fcntl
+import json
+import multiprocessing
+import os
+import time
+import traceback
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+TRAIN_JOB_DIR = os.getenv("TRAIN_JOB_DIR", "train_jobs")
+
+# 每种模式依次经过的阶段（用来算进度）
+JOB_STAGES = {
+    "full": ["load_data", "fit", "publish"],
+    "incremental": ["load_data", "fit", "publish"],
+    "search": ["load_data", "search", "publish"],
+}
+
+
+def _job_path(job_id: str) -> Path:
+    return Path(TRAIN_JOB_DIR) / f"{job_id}.json"
+
+
+def _write_job(job: dict) -> None:
+    path = _job_path(job["job_id"])
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(job, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_job(job_id: str) -> Optional[dict]:
+    try:
+        with open(_job_path(job_id), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def list_jobs(limit: int = 20) -> list[dict]:
+    root = Path(TRAIN_JOB_DIR)
+    if not root.exists():
+        return []
+    jobs = [read_job(p.stem) for p in root.glob("*.json")]
+    jobs = [j for j in jobs if j is not None]
+    jobs.sort(key=lambda j: j["created_at"], reverse=True)
+    return jobs[:limit]
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
+
+
+# ======================
+# 子进程里执行
+# ======================
+class _JobReporter:
+    def __init__(self, job: dict):
+        self.job = job
+        self.planned = JOB_STAGES[job["mode"]]
+
+    def _update(self, **fields) -> None:
+        self.job.update(fields)
+        _write_job(self.job)
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        self._update(stage=name)
+        try:
+            yield
+        finally:
+            self.job["stages"].append({"name": name, "seconds": round(time.perf_counter() - started, 3)})
+            done = len({s["name"] for s in self.job["stages"]} & set(self.planned))
+            self._update(progress=round(done / len(self.planned), 2))
+
+
+@contextmanager
+def _train_lock():
+    # 同一时间只允许一个训练任务（跨 uvicorn worker / 跨容器共享同一个目录时都有效）
+    with open(Path(TRAIN_JOB_DIR) / ".lock", "w") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _run_job(job_id: str) -> Optional[str]:
+    from app import train
+    from app.services.model_store import model_store
+
+    job = read_job(job_id)
+    reporter = _JobReporter(job)
+    with _train_lock():
+        reporter._update(status="running", started_at=_now(), pid=os.getpid())
+        started = time.perf_counter()
+        try:
+            params = job["params"]
+            if params.get("if_missing") and model_store.current_version():
+                # 启动时的兜底训练：别的 worker 已经训好了（旧的单文件 pkl 不算）
+                reporter._update(status="skipped", progress=1.0, finished_at=_now())
+                return None
+
+            if job["mode"] == "incremental":
+                version = train.train_incremental(
+                    stage=reporter.stage,
+                    replace_current=params.get("replace_current", False),
+                )
+            elif job["mode"] == "search":
+                version = train.train_search(
+                    folds=params.get("folds", 5),
+                    save_best=params.get("save_best", True),
+                    stage=reporter.stage,
+                )
+            else:
+                version = train.train_and_save(stage=reporter.stage)
+        except Exception as e:
+            reporter._update(
+                status="failed",
+                error=f"{type(e).__name__}: {e}",
+                traceback=traceback.format_exc(),
+                finished_at=_now(),
+                total_seconds=round(time.perf_counter() - started, 3),
+            )
+            raise
+
+        reporter._update(
+            status="succeeded",
+            progress=1.0,
+            stage=None,
+            model_version=version,
+            finished_at=_now(),
+            total_seconds=round(time.perf_counter() - started, 3),
+        )
+        return version
+
+
+# ======================
+# uvicorn 进程里：提交 + 回收
+# ======================
+class TrainJobRunner:
+    def __init__(self):
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn：子进程不继承 uvicorn 的事件循环 / 线程 / 数据库连接；
+            # max_tasks_per_child=1：每个任务一个新进程，训练完内存全部还给系统
+            self._pool = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=1,
+            )
+        return self._pool
+
+    def submit(self, mode: str = "full", **params) -> dict:
+        if mode not in JOB_STAGES:
+            raise ValueError(f"未知的训练模式: {mode}")
+        Path(TRAIN_JOB_DIR).mkdir(parents=True, exist_ok=True)
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "mode": mode,
+            "params": params,
+            "status": "queued",
+            "progress": 0.0,
+            "stage": None,
+            "stages": [],
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "total_seconds": None,
+            "model_version": None,
+            "error": None,
+        }
+        _write_job(job)
+
+        future = self._get_pool().submit(_run_job, job["job_id"])
+        future.add_done_callback(lambda f: self._on_done(job["job_id"], f))
+        return job
+
+    def _on_done(self, job_id: str, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            if future.result() is not None:
+                # 新模型已经发布，本 worker 立刻切过去
+                from app.services.model_registry import registry
+
+                registry.reload()
+            return
+
+        job = read_job(job_id)
+        if job is not None and job["status"] in ("queued", "running"):
+            # 子进程被杀 / 崩溃（BrokenProcessPool），没来得及自己写状态
+            job.update(status="failed", error=f"{type(error).__name__}: {error}", finished_at=_now())
+            _write_job(job)
+        # 进程池坏了就丢掉，下次提交重新建
+        if isinstance(error, BrokenProcessPool):
+            self._pool = None
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+train_job_runner = TrainJobRunner()
@@ -1,15 +1,30 @@
 import joblib
 import pandas as pd
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import OneHotEncoder
+from sklearn.linear_model import LinearRegression, SGDRegressor
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
 from app.db import SessionLocal
 from app import models
+from app.services.features import (
+    CAT_COLS,
+    FEATURE_COLUMNS,
+    FEATURE_TABLE_COLUMNS,
+    NUM_COLS,
+    build_features_from_rows,
+    build_features_from_table_rows,
+)
+from app.services.import_seq import current_import_seq
+import argparse
+import json
+import os
 import re
+from contextlib import nullcontext
 from datetime import datetime
+from typing import Callable, ContextManager, Optional
 
 def parse_float(val):
     if val is None:
@@ -36,9 +51,30 @@ def parse_age_years_from_plate(val):
     return max(now_year - year, 0)
 
 
+# 旧的单文件模型：只在模型仓库（models/，见 app/services/model_store.py）还没有版本时读取
 MODEL_PATH = "car_price_model.pkl"
 
+# 训练数据每次从数据库流式取多少行
+TRAIN_CHUNK_SIZE = 5000
+
+# 分阶段计时的钩子：stage("fit") 返回一个 context manager（后台训练任务用来上报进度）
+StageHook = Callable[[str], ContextManager]
+
+
+def _no_stage(_name: str) -> ContextManager:
+    return nullcontext()
+
+# 增量训练的水位线：记录已经喂给模型的最大 crawl_car_features.import_seq（按提交顺序，见 import_seq.py）
+TRAIN_STATE_PATH = "car_price_model.state.json"
+# 每批新数据 partial_fit 几轮
+INCREMENTAL_EPOCHS = 5
+# 增量模型的类别空间在全量重训时定下来，之后新品牌 / 变速箱按 handle_unknown="ignore" 贡献 0；
+# 距上次全量重训超过这么多天，或者上次全量重训以来带没见过类别的行占比超过阈值，才全量重训一次
+FULL_REFIT_INTERVAL_DAYS = 7
+UNKNOWN_CATEGORY_REFIT_RATIO = 0.05
+
 def build_row(c: models.CrawlCar):
+    # 单行版本，保留做对照；训练走 app/services/features.py 的列式解析
     info = c.info or {}
 
     brand = "未知"
@@ -64,31 +100,161 @@ def build_row(c: models.CrawlCar):
         "y": price_used,
     }
 
-def train_and_save():
-    db: Session = SessionLocal()
-    cars = db.query(models.CrawlCar).all()
+def features_table_complete(db: Session) -> bool:
+    """crawl_car_features 是否已经覆盖所有 crawl_cars（没回填完就还得解析 JSON）"""
+    missing = db.execute(
+        select(models.CrawlCar.id)
+        .outerjoin(models.CrawlCarFeature, models.CrawlCarFeature.crawl_car_id == models.CrawlCar.id)
+        .where(models.CrawlCarFeature.crawl_car_id.is_(None))
+        .limit(1)
+    ).first()
+    return missing is None
+
+
+def iter_training_chunks(
+    db: Session,
+    chunk_size: int = TRAIN_CHUNK_SIZE,
+    after_seq: int = 0,
+    until_seq: Optional[int] = None,
+):
+    """
+    服务端游标 + yield_per 分块读训练数据，每块直接转成一个小 DataFrame，
+    不会把整张表的 ORM 对象一次性读进内存。
+    - 优先读 crawl_car_features 的类型化列
+    - 特征表还没回填完时，退回读 crawl_cars 的 title / info 再解析
+    只读 after_seq < import_seq <= until_seq 的行（增量训练用，只有特征表完整时才支持）。
+    """
+    incremental = after_seq > 0 or until_seq is not None
+    if features_table_complete(db):
+        order_col = models.CrawlCarFeature.import_seq
+        stmt = select(*[getattr(models.CrawlCarFeature, c) for c in FEATURE_TABLE_COLUMNS])
+        if incremental:
+            stmt = stmt.where(order_col > after_seq)
+            if until_seq is not None:
+                stmt = stmt.where(order_col <= until_seq)
+        build = build_features_from_table_rows
+    else:
+        if incremental:
+            # crawl_cars 上没有按提交顺序的序号，按 id 切会漏掉晚提交的小 id
+            raise RuntimeError("crawl_car_features 未回填完整，不能按水位线读增量数据")
+        print("⚠️ crawl_car_features 未回填完整，训练改为解析 CrawlCar.info（python -m app.scripts.backfill_crawl_features）")
+        order_col = models.CrawlCar.id
+        stmt = select(models.CrawlCar.title, models.CrawlCar.info)
+        build = build_features_from_rows
+
+    stmt = stmt.order_by(order_col).execution_options(stream_results=True, yield_per=chunk_size)
+
+    result = db.execute(stmt)
+    now_year = datetime.now().year
+    for partition in result.partitions():
+        # 整块做列式处理，并过滤缺失值（第一版先简单点）
+        chunk = build(partition, now_year=now_year)
+        if not chunk.empty:
+            # 品牌 / 变速箱重复度很高，用 category 存省内存
+            chunk["brand"] = chunk["brand"].astype("category")
+            chunk["gearbox"] = chunk["gearbox"].astype("category")
+            yield chunk
+
+
+def load_training_df(
+    db: Session,
+    chunk_size: int = TRAIN_CHUNK_SIZE,
+    after_seq: int = 0,
+    until_seq: Optional[int] = None,
+) -> pd.DataFrame:
+    chunks = list(iter_training_chunks(db, chunk_size, after_seq, until_seq))
+    if not chunks:
+        return pd.DataFrame()
+    # 各块的 category 取值不同，合并后统一回 object，交给 OneHotEncoder
+    df = pd.concat(chunks, ignore_index=True)
+    df["brand"] = df["brand"].astype(object)
+    df["gearbox"] = df["gearbox"].astype(object)
+    return df
+
+
+def _save_model(
+    model,
+    X: pd.DataFrame,
+    y: pd.Series,
+    metadata: Optional[dict] = None,
+    training_rows: Optional[int] = None,
+) -> str:
+    """
+    发布到版本化模型仓库（models/<version>/ + CURRENT 指针），返回版本号。
+    线上服务发现 CURRENT 变了就热切换，不会读到写了一半的模型。
+    增量更新时 X / y 只是这次新增的数据：传累计的 training_rows，
+    指标记成 delta_mae / delta_mape（只在新数据上算的），不冒充整个训练集的指标。
+    """
+    from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
+
+    from app.services.compiled_model import check_parity, try_compile
+    from app.services.model_store import model_store
+
+    # 导出纯算术打分表，并在训练集上核对与 sklearn 结果一致
+    table = try_compile(model)
+    if table is None:
+        # 树模型等非线性模型没有打分表，线上走 sklearn
+        print(f"ℹ️ {type(model.named_steps['reg']).__name__} 不是线性模型，跳过打分表导出")
+    else:
+        max_err = check_parity(table, model, X)
+        print(f"✅ scoring table parity ok on {len(X)} rows, max_abs_err={max_err:.2e}")
+
+    pred = model.predict(X)
+    mae = float(mean_absolute_error(y, pred))
+    mape = float(mean_absolute_percentage_error(y, pred))
+    if training_rows is None:
+        rows = {"training_rows": len(X)}
+        metrics = {"train_mae": mae, "train_mape": mape}
+    else:
+        rows = {"training_rows": training_rows, "delta_rows": len(X)}
+        metrics = {"delta_mae": mae, "delta_mape": mape}
 
-    rows = []
-    for c in cars:
-        r = build_row(c)
-        # 过滤缺失值（第一版先简单点）
-        if any(r[k] is None for k in ["age_years", "engine", "price_new", "y"]):
-            continue
-        rows.append(r)
+    version = model_store.publish(
+        model,
+        {
+            **rows,
+            "feature_schema": {
+                "num_cols": NUM_COLS,
+                "cat_cols": CAT_COLS,
+                "columns": FEATURE_COLUMNS,
+            },
+            "metrics": metrics,
+            **(metadata or {}),
+        },
+        scoring=table,
+    )
+    print(f"✅ published: {model_store.version_dir(version)}, {rows}")
+    return version
+
+
+def load_current_model():
+    """模型仓库的当前版本；还没有仓库时读旧的单文件模型"""
+    from app.services.model_store import model_store
+
+    version = model_store.current_version()
+    if version is not None:
+        # 增量训练要 partial_fit 改系数，不能用只读 mmap
+        return model_store.load_model(version, mmap=False)
+    return joblib.load(MODEL_PATH) if os.path.exists(MODEL_PATH) else None
+
+
+def train_and_save(stage: StageHook = _no_stage) -> str:
+    with stage("load_data"):
+        db: Session = SessionLocal()
+        try:
+            df = load_training_df(db)
+        finally:
+            db.close()
 
-    df = pd.DataFrame(rows)
     if df.empty:
         raise RuntimeError("训练数据为空：检查 CrawlCar.info 是否包含 当前售价/新车指导价/上牌时间/排量 等字段")
 
     X = df.drop(columns=["y"])
     y = df["y"]
 
-    num_cols = ["age_years", "engine", "transfer_cnt", "price_new"]
-    cat_cols = ["brand", "gearbox"]
-
     pre = ColumnTransformer([
-        ("num", "passthrough", num_cols),
-        ("cat", OneHotEncoder(handle_unknown="ignore"), cat_cols),
+        ("num", "passthrough", NUM_COLS),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), CAT_COLS),
     ])
 
     model = Pipeline([
@@ -96,12 +262,243 @@ def train_and_save():
         ("reg", LinearRegression()),
     ])
 
-    model.fit(X, y)
-    joblib.dump(model, MODEL_PATH)
-    print(f"✅ saved: {MODEL_PATH}, samples={len(df)}")
+    with stage("fit"):
+        model.fit(X, y)
+    with stage("publish"):
+        return _save_model(model, X, y, {"mode": "full"})
+
+
+# ======================
+# 增量训练（SGDRegressor.partial_fit）
+# ======================
+def load_train_state() -> dict:
+    try:
+        with open(TRAIN_STATE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_train_state(state: dict) -> None:
+    tmp_path = f"{TRAIN_STATE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, TRAIN_STATE_PATH)
+
+
+def build_online_model() -> Pipeline:
+    # 数值特征标准化（全量重训时拟合，之后冻结），SGD 对量纲很敏感
+    pre = ColumnTransformer([
+        ("num", StandardScaler(), NUM_COLS),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), CAT_COLS),
+    ])
+    return Pipeline([
+        ("preprocess", pre),
+        ("reg", SGDRegressor(penalty="l2", alpha=1e-4, max_iter=1000, tol=1e-4, random_state=42)),
+    ])
+
+
+def _is_online_model(model) -> bool:
+    return isinstance(getattr(model, "named_steps", {}).get("reg"), SGDRegressor)
+
+
+def _unknown_category_rows(model, X: pd.DataFrame) -> int:
+    """新数据里有几行的品牌 / 变速箱不在模型的类别空间里（这些列 one-hot 全为 0）"""
+    encoder = model.named_steps["preprocess"].named_transformers_["cat"]
+    unknown = pd.Series(False, index=X.index)
+    for col, known in zip(CAT_COLS, encoder.categories_):
+        unknown |= ~X[col].astype(str).isin(set(map(str, known)))
+    return int(unknown.sum())
+
+
+def _refit_due(state: dict) -> Optional[str]:
+    """到了该全量重训的时候返回原因，否则 None"""
+    refit_at = state.get("full_refit_at")
+    if refit_at is None:
+        return "没有全量重训记录"
+    days = (datetime.now() - datetime.fromisoformat(refit_at)).total_seconds() / 86400
+    if days >= FULL_REFIT_INTERVAL_DAYS:
+        return f"距上次全量重训 {days:.1f} 天"
+    new_rows = int(state.get("rows_seen", 0)) - int(state.get("refit_rows", 0))
+    unknown = int(state.get("unknown_rows", 0))
+    if new_rows > 0 and unknown / new_rows > UNKNOWN_CATEGORY_REFIT_RATIO:
+        return f"新数据里 {unknown}/{new_rows} 行带没见过的品牌/变速箱"
+    return None
+
+
+def _full_refit_online(db: Session, stage: StageHook = _no_stage) -> str:
+    with stage("load_data"):
+        max_seq = current_import_seq(db)
+        df = load_training_df(db, until_seq=max_seq)
+    if df.empty:
+        raise RuntimeError("训练数据为空：检查 CrawlCar.info 是否包含 当前售价/新车指导价/上牌时间/排量 等字段")
+
+    X = df.drop(columns=["y"])
+    model = build_online_model()
+    with stage("fit"):
+        model.fit(X, df["y"])
+    with stage("publish"):
+        version = _save_model(model, X, df["y"], {"mode": "incremental", "watermark_seq": max_seq})
+    save_train_state({
+        "mode": "incremental",
+        "last_seq": max_seq,
+        "rows_seen": len(df),
+        "refit_rows": len(df),
+        "unknown_rows": 0,
+        "full_refit_at": datetime.now().isoformat(),
+    })
+    print(f"🔁 full refit: rows={len(df)}, watermark seq={max_seq}")
+    return version
+
+
+def _current_store_mode() -> tuple[Optional[str], Optional[str]]:
+    """模型仓库当前版本和它的训练模式（metadata.json 里的 mode）；没有仓库时都是 None"""
+    from app.services.model_store import model_store
+
+    version = model_store.current_version()
+    if version is None:
+        return None, None
+    try:
+        return version, model_store.metadata(version).get("mode")
+    except (OSError, ValueError):
+        return version, None
+
+
+def train_incremental(stage: StageHook = _no_stage, replace_current: bool = False) -> Optional[str]:
+    """
+    只把水位线之后的新数据喂给模型，耗时跟新增量成正比：
+    - 还没有增量模型 / 水位线 -> 全量重训一次
+    - 否则用冻结的预处理 transform 新数据，SGDRegressor.partial_fit 几轮；
+      没见过的品牌 / 变速箱 one-hot 全为 0（只靠数值特征），不为它单独重训
+    - 按 _refit_due 定期全量重训一次，把这段时间的新类别并进类别空间
+    线上模型是全量训练（full）/ 选型（search）发布的时候不动它，打印提示后跳过；
+    replace_current=True 才会用增量（SGD）模型替换掉它。
+    水位线是 crawl_car_features.import_seq（按提交顺序），并发导入时晚提交的小 id 也不会漏；
+    特征表没回填完整时没有序号可用，跳过。
+    返回新发布的模型版本；没有新数据时返回 None
+    """
+    db: Session = SessionLocal()
+    try:
+        if not features_table_complete(db):
+            print("⚠️ crawl_car_features 未回填完整，跳过增量训练（python -m app.scripts.backfill_crawl_features）")
+            return None
+
+        current, current_mode = _current_store_mode()
+        if current_mode in ("full", "search") and not replace_current:
+            print(
+                f"⚠️ 线上模型 {current} 是 {current_mode} 训练发布的，增量训练不会替换它；"
+                "确认要切换到增量模型时加 --replace-current（POST /train 传 replace_current=true）"
+            )
+            return None
+
+        state = load_train_state()
+        model = load_current_model()
+
+        if model is None or not _is_online_model(model) or state.get("mode") != "incremental":
+            print("ℹ️ 没有可增量更新的模型，先全量重训")
+            return _full_refit_online(db, stage)
+
+        # 旧的状态文件记的是 crawl_cars.id；迁移时 import_seq 按 crawl_car_id 编号，数值可以直接沿用
+        last_seq = int(state.get("last_seq", state.get("last_id", 0)))
+        with stage("load_data"):
+            # 先记下这次的上界，避免训练过程中新提交的行被跳过
+            max_seq = current_import_seq(db)
+            if max_seq <= last_seq:
+                print(f"✅ 没有新数据（watermark seq={last_seq}）")
+                return None
+
+            df = load_training_df(db, after_seq=last_seq, until_seq=max_seq)
+
+        unknown = _unknown_category_rows(model, df) if not df.empty else 0
+        state = {
+            **state,
+            "rows_seen": int(state.get("rows_seen", 0)) + len(df),
+            "unknown_rows": int(state.get("unknown_rows", 0)) + unknown,
+        }
+        reason = _refit_due(state)
+        if reason is not None:
+            print(f"ℹ️ {reason}，全量重训")
+            return _full_refit_online(db, stage)
+
+        version = None
+        if not df.empty:
+            X = df.drop(columns=["y"])
+            with stage("fit"):
+                Xt = model.named_steps["preprocess"].transform(X)
+                reg = model.named_steps["reg"]
+                for _ in range(INCREMENTAL_EPOCHS):
+                    reg.partial_fit(Xt, df["y"].to_numpy())
+            with stage("publish"):
+                version = _save_model(
+                    model,
+                    X,
+                    df["y"],
+                    {"mode": "incremental", "watermark_seq": max_seq},
+                    training_rows=state["rows_seen"],
+                )
+
+        state.pop("last_id", None)
+        save_train_state({
+            **state,
+            "last_seq": max_seq,
+            "updated_at": datetime.now().isoformat(),
+        })
+        print(f"➕ incremental: new_rows={len(df)}, unknown_category_rows={unknown}, watermark seq {last_seq} -> {max_seq}")
+        return version
+    finally:
+        db.close()
+
 
 def load_model():
-    return joblib.load(MODEL_PATH)
+    return load_current_model()
+
+# ======================
+# 模型选型 / 超参搜索
+# ======================
+def train_search(folds: int = 5, save_best: bool = False, stage: StageHook = _no_stage) -> Optional[str]:
+    from app.train_search import print_leaderboard, run_search, save_leaderboard, LEADERBOARD_PATH
+
+    with stage("load_data"):
+        db: Session = SessionLocal()
+        try:
+            df = load_training_df(db)
+        finally:
+            db.close()
+
+    if df.empty:
+        raise RuntimeError("训练数据为空：检查 CrawlCar.info 是否包含 当前售价/新车指导价/上牌时间/排量 等字段")
+
+    with stage("search"):
+        board, fitted = run_search(df, folds=folds)
+    print_leaderboard(board)
+    save_leaderboard(board)
+    print(f"✅ leaderboard: {LEADERBOARD_PATH}")
+
+    if not save_best:
+        return None
+    best = board[0]
+    print(f"🏆 上线 MAE 最低的候选: {best['key']}")
+    with stage("publish"):
+        return _save_model(
+            fitted[best["key"]],
+            df.drop(columns=["y"]),
+            df["y"],
+            {"mode": "search", "candidate": best["key"], "cv_mae": best["cv_mae"], "cv_mape": best["cv_mape"]},
+        )
+
 
 if __name__ == "__main__":
-    train_and_save()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--incremental", action="store_true", help="只用水位线之后的新数据增量更新模型")
+    parser.add_argument("--replace-current", action="store_true", help="--incremental 时允许替换 full / search 发布的线上模型")
+    parser.add_argument("--search", action="store_true", help="多模型 + 超参网格交叉验证，输出精度/延迟排行榜")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--save-best", action="store_true", help="--search 后把 MAE 最低的模型保存为线上模型")
+    args = parser.parse_args()
+
+    if args.search:
+        train_search(folds=args.folds, save_best=args.save_best)
+    elif args.incremental:
+        train_incremental(replace_current=args.replace_current)
+    else:
+        train_and_save()
@@ -0,0 +1,159 @@
+# app/train_search.py
+"""
+模型选型 + 超参搜索（python -m app.train --search）：
+- 候选：LinearRegression / Ridge / HistGradientBoosting / RandomForest，各带一组参数网格
+- K 折交叉验证，所有 (候选, 折) 组合用 joblib 铺满所有 CPU 核并行跑
+- 排行榜同时给出精度（当前售价的 MAE / MAPE）和推理延迟（单条 / 批量），
+  方便在“准”和“快”之间挑一个上线
+"""
+import json
+import os
+import time
+from itertools import product
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, mean_absolute_percentage_error
+from sklearn.model_selection import KFold
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from app.services.features import CAT_COLS, NUM_COLS
+
+LEADERBOARD_PATH = "car_price_model.leaderboard.json"
+
+# (名字, 回归器, 参数网格, 是否需要稠密输入)
+CANDIDATES = [
+    ("linear", LinearRegression(), {}, False),
+    ("ridge", Ridge(), {"alpha": [0.1, 1.0, 10.0]}, False),
+    (
+        "hgb",
+        HistGradientBoostingRegressor(random_state=42),
+        {"learning_rate": [0.05, 0.1], "max_leaf_nodes": [15, 31], "max_iter": [200]},
+        True,
+    ),
+    (
+        "rf",
+        RandomForestRegressor(random_state=42, n_jobs=1),
+        {"n_estimators": [100, 300], "max_depth": [None, 12]},
+        False,
+    ),
+]
+
+
+def _build_pipeline(reg, dense: bool) -> Pipeline:
+    pre = ColumnTransformer(
+        [
+            ("num", "passthrough", NUM_COLS),
+            ("cat", OneHotEncoder(handle_unknown="ignore"), CAT_COLS),
+        ],
+        # HistGradientBoosting 不吃稀疏矩阵
+        sparse_threshold=0.0 if dense else 0.3,
+    )
+    return Pipeline([("preprocess", pre), ("reg", reg)])
+
+
+def _expand_grid(grid: dict) -> list[dict]:
+    if not grid:
+        return [{}]
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in product(*(grid[k] for k in keys))]
+
+
+def iter_candidates():
+    for name, reg, grid, dense in CANDIDATES:
+        for params in _expand_grid(grid):
+            yield name, params, _build_pipeline(clone(reg).set_params(**params), dense)
+
+
+def _eval_fold(model, X, y, train_idx, test_idx) -> tuple[float, float]:
+    model = clone(model)
+    model.fit(X.iloc[train_idx], y.iloc[train_idx])
+    pred = model.predict(X.iloc[test_idx])
+    y_true = y.iloc[test_idx]
+    return mean_absolute_error(y_true, pred), mean_absolute_percentage_error(y_true, pred)
+
+
+def _fit_full(model, X, y):
+    model = clone(model)
+    model.fit(X, y)
+    return model
+
+
+def measure_latency(model, X: pd.DataFrame, single_runs: int = 200, batch_rows: int = 10000) -> dict:
+    row = X.iloc[[0]]
+    model.predict(row)  # 预热
+    times = []
+    for _ in range(single_runs):
+        t0 = time.perf_counter()
+        model.predict(row)
+        times.append(time.perf_counter() - t0)
+
+    batch = X.sample(batch_rows, replace=True, random_state=0)
+    t0 = time.perf_counter()
+    model.predict(batch)
+    batch_elapsed = time.perf_counter() - t0
+
+    return {
+        "single_p50_ms": float(np.percentile(times, 50) * 1000),
+        "single_p99_ms": float(np.percentile(times, 99) * 1000),
+        "batch_us_per_row": batch_elapsed / batch_rows * 1e6,
+    }
+
+
+def run_search(df: pd.DataFrame, folds: int = 5, n_jobs: int = -1):
+    """返回 (排行榜, {候选 key: 在全量数据上拟合好的模型})"""
+    X = df[NUM_COLS + CAT_COLS]
+    y = df["y"]
+    folds = max(2, min(folds, len(df)))
+    splits = list(KFold(n_splits=folds, shuffle=True, random_state=42).split(X))
+    candidates = list(iter_candidates())
+
+    # 所有 (候选, 折) 一起丢给 joblib，按核数并行
+    t0 = time.perf_counter()
+    fold_scores = Parallel(n_jobs=n_jobs)(
+        delayed(_eval_fold)(model, X, y, tr, te)
+        for _, _, model in candidates
+        for tr, te in splits
+    )
+    fitted = Parallel(n_jobs=n_jobs)(delayed(_fit_full)(model, X, y) for _, _, model in candidates)
+    print(f"⏱️ CV + refit: {len(candidates)} candidates x {folds} folds in {time.perf_counter() - t0:.1f}s")
+
+    board = []
+    models_by_key = {}
+    for i, ((name, params, _), model) in enumerate(zip(candidates, fitted)):
+        scores = fold_scores[i * folds:(i + 1) * folds]
+        key = f"{name}{json.dumps(params, sort_keys=True)}" if params else name
+        models_by_key[key] = model
+        board.append({
+            "key": key,
+            "family": name,
+            "params": params,
+            "cv_mae": float(np.mean([s[0] for s in scores])),
+            "cv_mape": float(np.mean([s[1] for s in scores])),
+            **measure_latency(model, X),
+        })
+
+    board.sort(key=lambda r: r["cv_mae"])
+    return board, models_by_key
+
+
+def print_leaderboard(board: list[dict]) -> None:
+    print(f"{'#':>2} {'candidate':<56} {'MAE(万)':>8} {'MAPE':>7} {'p50(ms)':>8} {'p99(ms)':>8} {'batch(us/row)':>13}")
+    for i, r in enumerate(board, 1):
+        print(
+            f"{i:>2} {r['key']:<56} {r['cv_mae']:>8.3f} {r['cv_mape']:>7.2%} "
+            f"{r['single_p50_ms']:>8.2f} {r['single_p99_ms']:>8.2f} {r['batch_us_per_row']:>13.2f}"
+        )
+
+
+def save_leaderboard(board: list[dict], path: str = LEADERBOARD_PATH) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(board, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,41 @@
+"""add cars.sync_seq and car_sync_counters
+
+Revision ID: 0a6d3e9b4c27
+Revises: f7c2a8e4b913
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a6d3e9b4c27'
+down_revision: Union[str, Sequence[str], None] = 'f7c2a8e4b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('cars', sa.Column('sync_seq', sa.BigInteger(), nullable=True))
+    # 已有的行都已经提交了，按 id 顺序编号即可
+    op.execute("UPDATE cars SET sync_seq = id")
+    op.create_index(op.f('ix_cars_sync_seq'), 'cars', ['sync_seq'], unique=False)
+
+    op.create_table(
+        'car_sync_counters',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.execute("INSERT INTO car_sync_counters (name, value) SELECT 'cars', COALESCE(MAX(sync_seq), 0) FROM cars")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('car_sync_counters')
+    op.drop_index(op.f('ix_cars_sync_seq'), table_name='cars')
+    op.drop_column('cars', 'sync_seq')
@@ -0,0 +1,53 @@
+"""add crawl_car_features.import_seq, stats watermark by import_seq
+
+Revision ID: 3e8b1f5c7d92
+Revises: 0a6d3e9b4c27
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8b1f5c7d92'
+down_revision: Union[str, Sequence[str], None] = '0a6d3e9b4c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('crawl_car_features', sa.Column('import_seq', sa.BigInteger(), nullable=True))
+    # 已有的行都已经提交了，按 crawl_car_id 编号；和原来按 id 记的统计水位线正好对得上
+    op.execute("UPDATE crawl_car_features SET import_seq = crawl_car_id")
+    op.create_index(op.f('ix_crawl_car_features_import_seq'), 'crawl_car_features', ['import_seq'], unique=False)
+
+    op.execute(
+        "INSERT INTO car_sync_counters (name, value) "
+        "SELECT 'crawl_car_features', COALESCE(MAX(import_seq), 0) FROM crawl_car_features"
+    )
+
+    op.alter_column(
+        'crawl_car_stat_watermarks', 'last_id',
+        new_column_name='last_seq',
+        existing_type=sa.Integer(),
+        type_=sa.BigInteger(),
+        existing_nullable=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'crawl_car_stat_watermarks', 'last_seq',
+        new_column_name='last_id',
+        existing_type=sa.BigInteger(),
+        type_=sa.Integer(),
+        existing_nullable=False,
+    )
+    op.execute("DELETE FROM car_sync_counters WHERE name = 'crawl_car_features'")
+    op.drop_index(op.f('ix_crawl_car_features_import_seq'), table_name='crawl_car_features')
+    op.drop_column('crawl_car_features', 'import_seq')
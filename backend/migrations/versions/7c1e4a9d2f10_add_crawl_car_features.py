@@ -0,0 +1,54 @@
+"""add crawl_car_features
+
+Revision ID: 7c1e4a9d2f10
+Revises: 3b59f60ad0a2
+Create Date: 2026-10-17 22:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4a9d2f10'
+down_revision: Union[str, Sequence[str], None] = '3b59f60ad0a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'crawl_car_features',
+        sa.Column('crawl_car_id', sa.Integer(), nullable=False),
+        sa.Column('brand', sa.String(length=64), nullable=True),
+        sa.Column('plate_year', sa.Integer(), nullable=True),
+        sa.Column('engine', sa.Float(), nullable=True),
+        sa.Column('gearbox', sa.String(length=32), nullable=True),
+        sa.Column('transfer_cnt', sa.Integer(), nullable=True),
+        sa.Column('price_new', sa.Float(), nullable=True),
+        sa.Column('price_used', sa.Float(), nullable=True),
+        sa.Column('city', sa.String(length=64), nullable=True),
+        sa.ForeignKeyConstraint(['crawl_car_id'], ['crawl_cars.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('crawl_car_id'),
+    )
+    op.create_index('ix_crawl_car_features_brand', 'crawl_car_features', ['brand'])
+    op.create_index('ix_crawl_car_features_plate_year', 'crawl_car_features', ['plate_year'])
+    op.create_index('ix_crawl_car_features_gearbox', 'crawl_car_features', ['gearbox'])
+    op.create_index('ix_crawl_car_features_price_used', 'crawl_car_features', ['price_used'])
+    op.create_index('ix_crawl_car_features_city', 'crawl_car_features', ['city'])
+    op.create_index('ix_crawl_car_features_brand_price', 'crawl_car_features', ['brand', 'price_used'])
+    # 已有数据用 python -m app.scripts.backfill_crawl_features 回填
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crawl_car_features_brand_price', table_name='crawl_car_features')
+    op.drop_index('ix_crawl_car_features_city', table_name='crawl_car_features')
+    op.drop_index('ix_crawl_car_features_price_used', table_name='crawl_car_features')
+    op.drop_index('ix_crawl_car_features_gearbox', table_name='crawl_car_features')
+    op.drop_index('ix_crawl_car_features_plate_year', table_name='crawl_car_features')
+    op.drop_index('ix_crawl_car_features_brand', table_name='crawl_car_features')
+    op.drop_table('crawl_car_features')
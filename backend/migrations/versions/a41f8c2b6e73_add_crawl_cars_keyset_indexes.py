@@ -0,0 +1,31 @@
+"""add crawl_cars keyset indexes
+
+Revision ID: a41f8c2b6e73
+Revises: 7c1e4a9d2f10
+Create Date: 2026-10-17 22:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f8c2b6e73'
+down_revision: Union[str, Sequence[str], None] = '7c1e4a9d2f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # /crawl-cars 按 (crawl_time DESC, id DESC) 做游标分页
+    op.create_index('ix_crawl_cars_crawl_time_id', 'crawl_cars', ['crawl_time', 'id'])
+    op.create_index('ix_crawl_cars_annotated_crawl_time_id', 'crawl_cars', ['is_annotated', 'crawl_time', 'id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crawl_cars_annotated_crawl_time_id', table_name='crawl_cars')
+    op.drop_index('ix_crawl_cars_crawl_time_id', table_name='crawl_cars')
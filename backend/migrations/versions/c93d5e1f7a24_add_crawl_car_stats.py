@@ -0,0 +1,49 @@
+"""add crawl_car_stats
+
+Revision ID: c93d5e1f7a24
+Revises: a41f8c2b6e73
+Create Date: 2026-10-17 22:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c93d5e1f7a24'
+down_revision: Union[str, Sequence[str], None] = 'a41f8c2b6e73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'crawl_car_stats',
+        sa.Column('dimension', sa.String(length=32), nullable=False),
+        sa.Column('bucket', sa.String(length=64), nullable=False),
+        sa.Column('cnt', sa.Integer(), nullable=False),
+        sa.Column('price_used_sum', sa.Float(), nullable=False),
+        sa.Column('price_used_cnt', sa.Integer(), nullable=False),
+        sa.Column('price_new_sum', sa.Float(), nullable=False),
+        sa.Column('price_new_cnt', sa.Integer(), nullable=False),
+        sa.Column('depreciation_sum', sa.Float(), nullable=False),
+        sa.Column('depreciation_cnt', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('dimension', 'bucket'),
+    )
+    op.create_table(
+        'crawl_car_stat_watermarks',
+        sa.Column('name', sa.String(length=32), nullable=False),
+        sa.Column('last_id', sa.Integer(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    # 已有数据用 POST /stats/refresh?rebuild=true 或回填脚本聚合
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('crawl_car_stat_watermarks')
+    op.drop_table('crawl_car_stats')
@@ -0,0 +1,48 @@
+"""add crawl_cars info generated columns
+
+Revision ID: d2b7a6c4e815
+Revises: c93d5e1f7a24
+Create Date: 2026-10-17 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2b7a6c4e815'
+down_revision: Union[str, Sequence[str], None] = 'c93d5e1f7a24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# 需要 MySQL 8.0.21+（JSON_VALUE ... RETURNING）
+PRICE_USED_SQL = """JSON_VALUE(info, '$."当前售价"' RETURNING DECIMAL(10,2) NULL ON EMPTY NULL ON ERROR)"""
+PRICE_NEW_SQL = """JSON_VALUE(info, '$."新车指导价"' RETURNING DECIMAL(10,2) NULL ON EMPTY NULL ON ERROR)"""
+PLATE_YEAR_SQL = (
+    """CAST(LEFT(REGEXP_SUBSTR(JSON_VALUE(info, '$."上牌时间"' RETURNING CHAR(32) NULL ON ERROR), '[0-9]{4}年'), 4)"""
+    """ AS UNSIGNED)"""
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # VIRTUAL：加列是 instant 的，不重写表；值只在二级索引里物化
+    op.add_column('crawl_cars', sa.Column('price_used', sa.Numeric(10, 2), sa.Computed(PRICE_USED_SQL, persisted=False)))
+    op.add_column('crawl_cars', sa.Column('price_new', sa.Numeric(10, 2), sa.Computed(PRICE_NEW_SQL, persisted=False)))
+    op.add_column('crawl_cars', sa.Column('plate_year', sa.Integer(), sa.Computed(PLATE_YEAR_SQL, persisted=False)))
+    op.create_index('ix_crawl_cars_price_used', 'crawl_cars', ['price_used'])
+    op.create_index('ix_crawl_cars_price_new', 'crawl_cars', ['price_new'])
+    op.create_index('ix_crawl_cars_plate_year', 'crawl_cars', ['plate_year'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_crawl_cars_plate_year', table_name='crawl_cars')
+    op.drop_index('ix_crawl_cars_price_new', table_name='crawl_cars')
+    op.drop_index('ix_crawl_cars_price_used', table_name='crawl_cars')
+    op.drop_column('crawl_cars', 'plate_year')
+    op.drop_column('crawl_cars', 'price_new')
+    op.drop_column('crawl_cars', 'price_used')
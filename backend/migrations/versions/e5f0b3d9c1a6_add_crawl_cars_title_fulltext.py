@@ -0,0 +1,35 @@
+"""add crawl_cars title fulltext index
+
+Revision ID: e5f0b3d9c1a6
+Revises: d2b7a6c4e815
+Create Date: 2026-10-17 22:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f0b3d9c1a6'
+down_revision: Union[str, Sequence[str], None] = 'd2b7a6c4e815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ngram parser：中文没有空格分词，按 ngram_token_size（默认 2）切
+    op.create_index(
+        'ft_crawl_cars_title',
+        'crawl_cars',
+        ['title'],
+        mysql_prefix='FULLTEXT',
+        mysql_with_parser='ngram',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ft_crawl_cars_title', table_name='crawl_cars')
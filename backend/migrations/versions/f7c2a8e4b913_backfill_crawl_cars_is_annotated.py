@@ -0,0 +1,46 @@
+"""backfill crawl_cars.is_annotated from cars
+
+Revision ID: f7c2a8e4b913
+Revises: e5f0b3d9c1a6
+Create Date: 2026-10-17 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c2a8e4b913'
+down_revision: Union[str, Sequence[str], None] = 'e5f0b3d9c1a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 以前 create_annotation 不更新 is_annotated，按 cars 补一遍
+    op.execute(
+        "UPDATE crawl_cars SET is_annotated = "
+        "CASE WHEN source_car_id IN (SELECT source_car_id FROM cars) THEN 1 ELSE 0 END"
+    )
+    # 不留 NULL：待标注队列按 is_annotated = 0 走索引
+    op.alter_column(
+        'crawl_cars',
+        'is_annotated',
+        existing_type=sa.Integer(),
+        nullable=False,
+        server_default='0',
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column(
+        'crawl_cars',
+        'is_annotated',
+        existing_type=sa.Integer(),
+        nullable=True,
+        server_default=None,
+    )
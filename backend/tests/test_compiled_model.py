@@ -0,0 +1,60 @@
+# tests/test_compiled_model.py
+"""编译出来的打分表和 sklearn Pipeline 的预测要一致（误差不超过 PARITY_TOLERANCE）"""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from app.services.compiled_model import PARITY_TOLERANCE, ScoringTable, check_parity, compile_pipeline
+from app.services.features import CAT_COLS, FEATURE_COLUMNS, NUM_COLS
+from app.train import build_online_model
+
+
+def _synthetic_rows(n: int = 500, seed: int = 0) -> tuple[pd.DataFrame, pd.Series]:
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "brand": rng.choice(["宝马3系", "奥迪A4L", "凯美瑞", "传祺M8"], n).astype(object),
+        "age_years": rng.integers(0, 12, n).astype(float),
+        "engine": rng.choice([1.5, 2.0, 2.5, 3.0], n),
+        "gearbox": rng.choice(["自动", "手动"], n).astype(object),
+        "transfer_cnt": rng.integers(0, 4, n),
+        "price_new": rng.uniform(10, 60, n),
+    })[FEATURE_COLUMNS]
+    y = X["price_new"] * 0.8 - X["age_years"] * 1.2 - X["transfer_cnt"] * 0.5 + rng.normal(0, 0.5, n)
+    return X, y
+
+
+def _full_model() -> Pipeline:
+    # 和 train_and_save 的结构一致：数值直通 + one-hot + 最小二乘
+    pre = ColumnTransformer([
+        ("num", "passthrough", NUM_COLS),
+        ("cat", OneHotEncoder(handle_unknown="ignore"), CAT_COLS),
+    ])
+    return Pipeline([("preprocess", pre), ("reg", LinearRegression())])
+
+
+@pytest.mark.parametrize("build", [_full_model, build_online_model], ids=["linear", "sgd"])
+def test_scoring_table_matches_pipeline(build):
+    X, y = _synthetic_rows()
+    model = build().fit(X, y)
+    table = compile_pipeline(model)
+
+    assert check_parity(table, model, X) <= PARITY_TOLERANCE
+
+    # 没见过的品牌 / 变速箱：两边都按 0 贡献处理
+    unseen = X.head(20).copy()
+    unseen["brand"] = "未知品牌"
+    unseen.loc[unseen.index[:5], "gearbox"] = "双离合"
+    assert check_parity(table, model, unseen) <= PARITY_TOLERANCE
+
+
+def test_scoring_table_round_trip():
+    X, y = _synthetic_rows(n=100)
+    model = _full_model().fit(X, y)
+    table = compile_pipeline(model)
+
+    # 线上从 scoring.json 读回来的表要和刚编译的一样
+    assert check_parity(ScoringTable.from_dict(table.to_dict()), model, X) <= PARITY_TOLERANCE
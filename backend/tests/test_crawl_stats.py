@@ -0,0 +1,60 @@
+# tests/test_crawl_stats.py
+"""看板统计按 import_seq（提交顺序）增量累加，后提交的小 id 不会被水位线跳过"""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+from app.services.crawl_stats import brand_counts, rebuild_stats, refresh_stats, stats_overview
+from app.services.features import feature_records
+from app.services.import_seq import stamp_import_seq
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _import(db, car_ids: list[int], brand: str) -> None:
+    """模拟一次导入提交：crawl_cars + crawl_car_features，特征行按提交顺序分配 import_seq"""
+    titles = [f"{brand} 2020款"] * len(car_ids)
+    infos = [{"上牌时间": "2020年1月", "排量": "2.0T", "当前售价": 10.0, "新车指导价": 20.0}] * len(car_ids)
+    records = feature_records(titles, infos)
+    for car_id, title, info, rec in zip(car_ids, titles, infos, records):
+        db.add(models.CrawlCar(id=car_id, source_car_id=str(car_id), title=title, info=info))
+        rec["crawl_car_id"] = car_id
+    db.flush()
+    stamp_import_seq(db, records)
+    db.add_all(models.CrawlCarFeature(**rec) for rec in records)
+    db.commit()
+
+
+def test_late_commit_with_lower_ids_is_counted(db):
+    # 导入 B 拿到了更大的自增 id、先提交并刷新统计
+    _import(db, [101, 102, 103], "宝马3系")
+    assert refresh_stats(db) == 3
+
+    # 导入 A 的 id 更小，但后提交：按 MAX(id) 当水位线时这批会被永远跳过
+    _import(db, [11, 12], "凯美瑞")
+    assert refresh_stats(db) == 2
+
+    counts = {r["brand"]: r["count"] for r in brand_counts(db)}
+    assert counts == {"宝马3系": 3, "凯美瑞": 2}
+    assert stats_overview(db)["total"] == 5
+
+
+def test_incremental_matches_rebuild(db):
+    _import(db, [5, 6], "奥迪A4L")
+    refresh_stats(db)
+    _import(db, [1, 2, 3], "传祺M8")
+    refresh_stats(db)
+    incremental = brand_counts(db)
+
+    assert refresh_stats(db) == 0
+    rebuild_stats(db)
+    assert brand_counts(db) == incremental
@@ -0,0 +1,37 @@
+# tests/test_features.py
+"""列式特征解析（build_features）和逐行版本（train.build_row）结果要一致"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.scripts.bench_features import DEFAULT_JSON_DIR, load_samples, rowwise
+from app.services.features import FEATURE_COLUMNS, TARGET_COL, build_features
+
+# 补几条脏数据，覆盖空标题 / 空 info / 缺字段
+DIRTY_SAMPLES = [
+    SimpleNamespace(title=None, info=None),
+    SimpleNamespace(title="", info={"排量": "1.5L", "当前售价": 5.0}),
+    SimpleNamespace(title="宝马X3 2020款", info={"上牌时间": "2019年3月", "排量": "2.0T", "过户次数": "", "新车指导价": 40, "当前售价": 25}),
+]
+
+
+@pytest.fixture(scope="module")
+def samples() -> list[SimpleNamespace]:
+    # 仓库里带的爬虫样本（data/crawl/json）
+    return load_samples(DEFAULT_JSON_DIR) + DIRTY_SAMPLES
+
+
+def test_build_features_matches_rowwise(samples):
+    # build_row 按当前年份算车龄，两边用同一个年份
+    expected = rowwise(samples)
+    actual = build_features([c.title for c in samples], [c.info for c in samples], datetime.now().year)
+
+    assert len(expected) == len(actual) > 0
+    for col in FEATURE_COLUMNS + [TARGET_COL]:
+        a, b = expected[col], actual[col]
+        if col in ("brand", "gearbox"):
+            assert (a.astype(str).values == b.astype(str).values).all(), f"{col} 不一致"
+        else:
+            assert np.allclose(a.astype(float), b.astype(float)), f"{col} 不一致"
@@ -22,12 +22,15 @@ const API_BASE_URL = import.meta.env.VITE_API_BASE_URL;
 ===================== */
 
 interface CrawlCar {
-  car_id: string;
+  source_car_id: string;
   title: string;
   tags?: string[];
   info?: Record<string, string | number | null>;
   image_path?: string;
   crawl_time?: string;
+  // 列表接口直接带出标注状态 / 标注价，不用再单独拉 /annotations/ids
+  is_annotated?: number;
+  annotated_price?: number | null;
 }
 
 interface AnnotationForm {
@@ -66,7 +69,6 @@ function getSuggestedPrice(
 
 const CarAnnotationPage: React.FC = () => {
   const [cars, setCars] = useState<CrawlCar[]>([]);
-  const [annotatedIds, setAnnotatedIds] = useState<Set<string>>(new Set());
   const [loading, setLoading] = useState(false);
 
   const [selected, setSelected] = useState<CrawlCar | null>(null);
@@ -94,20 +96,8 @@ const CarAnnotationPage: React.FC = () => {
     }
   };
 
-  const fetchAnnotatedIds = async () => {
-    try {
-      const res = await fetch(`${API_BASE_URL}/annotations/ids`);
-      if (!res.ok) throw new Error();
-      const ids: string[] = await res.json();
-      setAnnotatedIds(new Set(ids));
-    } catch {
-      console.warn("获取已标注车辆失败");
-    }
-  };
-
   useEffect(() => {
     fetchCars();
-    fetchAnnotatedIds();
   }, []);
 
   /* =====================
@@ -130,7 +120,7 @@ const CarAnnotationPage: React.FC = () => {
 
     try {
       const payload = {
-        source_car_id: selected.car_id,
+        source_car_id: selected.source_car_id,
         price_wan: values.price_wan,
       };
 
@@ -150,7 +140,14 @@ const CarAnnotationPage: React.FC = () => {
       setDrawerOpen(false);
       setSelected(null);
       form.resetFields();
-      fetchAnnotatedIds();
+      // 本地直接标成已标注，不用重新拉列表
+      setCars((prev) =>
+        prev.map((c) =>
+          c.source_car_id === selected.source_car_id
+            ? { ...c, is_annotated: 1, annotated_price: values.price_wan }
+            : c
+        )
+      );
     } catch (e: any) {
       messageApi.error(e.message || "标注失败");
     }
@@ -173,9 +170,9 @@ const CarAnnotationPage: React.FC = () => {
         loading={loading}
         style={{ marginTop: 16 }}
         dataSource={cars}
-        rowKey="car_id"
+        rowKey="source_car_id"
         renderItem={(item) => {
-          const annotated = annotatedIds.has(item.car_id);
+          const annotated = Boolean(item.is_annotated);
 
           return (
             <List.Item